@@ -0,0 +1,27 @@
+r"""
+Benchmarks for ipyvue-flatsurf, run with airspeed velocity::
+
+    pixi run benchmark
+
+Each benchmark runs over a ladder of surfaces of increasing complexity, see
+:mod:`benchmark.surfaces`. Besides wall time, the benchmarks report peak
+memory and the size of the payloads that are sent to the frontend.
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
@@ -0,0 +1,159 @@
+r"""
+Benchmarks for turning flatsurf objects into what is sent to vue-flatsurf.
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from benchmark.surfaces import SURFACES, SQUARES, triangulation, decomposition, deformed_decomposition, saddle_connections, long_perimeter, payload_bytes
+
+
+class FlatTriangulation:
+    params = [SURFACES]
+    param_names = ["surface"]
+
+    def setup(self, surface):
+        self.triangulation = triangulation(surface)
+
+    def time_encode(self, surface):
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
+        encode_flat_triangulation(self.triangulation)
+
+    def peakmem_encode(self, surface):
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
+        encode_flat_triangulation(self.triangulation)
+
+    def time_encode_columnar(self, surface):
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation_columnar
+        encode_flat_triangulation_columnar(self.triangulation)
+
+    def track_yaml_bytes(self, surface):
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
+        from ipyvue_flatsurf.codec import get_codec
+        return payload_bytes(get_codec("yaml").encode(encode_flat_triangulation(self.triangulation)))
+
+    track_yaml_bytes.unit = "bytes"
+
+    def track_binary_bytes(self, surface):
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation_columnar
+        from ipyvue_flatsurf.codec import get_codec
+        return payload_bytes(get_codec("binary").encode(encode_flat_triangulation_columnar(self.triangulation)))
+
+    track_binary_bytes.unit = "bytes"
+
+
+class FlowComponent:
+    params = [SURFACES, [False, True]]
+    param_names = ["surface", "deformation"]
+
+    def setup(self, surface, deformation):
+        if deformation:
+            decomposition_, self.deformation = deformed_decomposition(surface)
+        else:
+            decomposition_, self.deformation = decomposition(surface), None
+        self.components = list(decomposition_.components())
+
+    def encode(self):
+        from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+        return [encode_flow_component(component, self.deformation) for component in self.components]
+
+    def time_encode(self, surface, deformation):
+        self.encode()
+
+    def peakmem_encode(self, surface, deformation):
+        self.encode()
+
+    def track_yaml_bytes(self, surface, deformation):
+        from ipyvue_flatsurf.codec import get_codec
+        return payload_bytes([get_codec("yaml").encode(component) for component in self.encode()])
+
+    track_yaml_bytes.unit = "bytes"
+
+
+class LongPerimeter:
+    r"""
+    Encodes flow components with thousands of perimeter steps or crossings.
+
+    The time per step (or per crossing for the one-cylinder origami whose
+    crossings are tied, see :func:`benchmark.surfaces.long_perimeter`)
+    should be roughly constant across the parameters.
+    """
+    params = [SQUARES, ["row", "one-cylinder"]]
+    param_names = ["squares", "origami"]
+    timeout = 600
+
+    def setup(self, squares, origami):
+        from ipyvue_flatsurf.encoding.flow_component_encoding import Encoder
+        self.component = long_perimeter(squares, origami)
+        self.encoder = Encoder(self.component)
+        self.encoder.touches
+
+    def time_touches(self, squares, origami):
+        from ipyvue_flatsurf.encoding.flow_component_encoding import Encoder
+        Encoder(self.component).touches
+
+    def time_touches_by_step(self, squares, origami):
+        self.encoder.__dict__.pop("touches_by_step", None)
+        self.encoder.touches_by_step
+
+    def time_encode(self, squares, origami):
+        from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+        encode_flow_component(self.component)
+
+    def track_steps(self, squares, origami):
+        return len(self.encoder.steps)
+
+    track_steps.unit = "steps"
+
+    def track_crossings(self, squares, origami):
+        return sum(len(step.path()) for (_, step) in self.encoder.steps)
+
+    track_crossings.unit = "crossings"
+
+
+class SaddleConnection:
+    params = [SURFACES]
+    param_names = ["surface"]
+
+    def setup(self, surface):
+        self.connections = saddle_connections(surface)
+
+    def time_encode(self, surface):
+        from ipyvue_flatsurf.encoding.saddle_connection_encoding import encode_saddle_connection
+        for connection in self.connections:
+            encode_saddle_connection(connection)
+
+
+class ToYAML:
+    params = [SURFACES]
+    param_names = ["surface"]
+
+    def setup(self, surface):
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
+        from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+        self.encoded = [encode_flat_triangulation(triangulation(surface))] + [encode_flow_component(component) for component in decomposition(surface).components()]
+
+    def time_to_yaml(self, surface):
+        from ipyvue_flatsurf.widgets.vue_flatsurf_widget import VueFlatsurfWidget
+        for encoded in self.encoded:
+            VueFlatsurfWidget._to_yaml(encoded)
+
+    def peakmem_to_yaml(self, surface):
+        from ipyvue_flatsurf.widgets.vue_flatsurf_widget import VueFlatsurfWidget
+        for encoded in self.encoded:
+            VueFlatsurfWidget._to_yaml(encoded)
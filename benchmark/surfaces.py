@@ -0,0 +1,163 @@
+r"""
+The surfaces that the benchmarks run on, from a square torus up to the
+translation covers of triangular billiards as in examples/billiards.ipynb.
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from functools import cache
+
+
+SURFACES = [
+    "square_torus",
+    "mcmullen_L",
+    "billiard(1, 1, 1)",
+    "billiard(1, 2, 4)",
+    "billiard(1, 4, 7)",
+]
+
+
+@cache
+def surface(name):
+    r"""
+    Return the sage-flatsurf translation surface called `name`.
+    """
+    from flatsurf import translation_surfaces, polygons, similarity_surfaces
+
+    if name == "square_torus":
+        return translation_surfaces.square_torus()
+    if name == "mcmullen_L":
+        return translation_surfaces.mcmullen_L(1, 1, 1, 1)
+    if name.startswith("billiard("):
+        angles = [int(angle) for angle in name[len("billiard("):-1].split(",")]
+        return similarity_surfaces.billiard(polygons.triangle(*angles)).minimal_cover("translation")
+
+    raise ValueError(f"unknown surface {name}")
+
+
+@cache
+def triangulation(name):
+    r"""
+    Return the pyflatsurf triangulation of the surface called `name`.
+    """
+    from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+    return to_pyflatsurf(surface(name))
+
+
+@cache
+def decomposition(name):
+    r"""
+    Return a flow decomposition of the surface called `name` (without marked
+    points.)
+    """
+    from flatsurf import GL2ROrbitClosure
+    O = GL2ROrbitClosure(surface(name).erase_marked_points())
+    return next(O.decompositions(bound=64))
+
+
+@cache
+def deformed_decomposition(name):
+    r"""
+    Return a flow decomposition of the surface called `name` after
+    eliminating its marked points together with the deformation that pulls
+    it back to the surface with marked points.
+    """
+    from flatsurf import GL2ROrbitClosure
+    deformation = triangulation(name).eliminateMarkedPoints()
+    O = GL2ROrbitClosure(deformation.codomain())
+    return next(O.decompositions(bound=64)), deformation.section()
+
+
+@cache
+def saddle_connections(name):
+    r"""
+    Return the saddle connections on the perimeters of the flow components
+    of :func:`decomposition`.
+    """
+    return [connection.saddleConnection() for component in decomposition(name).components() for connection in component.perimeter()]
+
+
+# The number of squares of the origamis in :func:`long_perimeter`.
+SQUARES = [250, 500, 1000, 2000]
+
+
+@cache
+def long_perimeter(squares, origami="row"):
+    r"""
+    Return the horizontal flow component with the longest perimeter of an
+    origami made of a single row of `squares`.
+
+    For the ``"row"`` origami, pairs of neighboring squares are glued to
+    each other vertically, so that the origami has lots of singularities and
+    the number of saddle connections on the perimeter grows linearly with
+    `squares`.
+
+    For the ``"one-cylinder"`` origami, only the first two squares are
+    glued to each other vertically, so there is a single horizontal
+    cylinder. Its perimeter consists of a few saddle connections and their
+    negatives whose crossings with the triangulation grow linearly with
+    `squares`. The crossings of a connection and its negative are at the
+    same points, so they can only be ordered with exact arithmetic.
+    """
+    from sage.all import SymmetricGroup
+    from flatsurf import translation_surfaces, GL2ROrbitClosure
+
+    G = SymmetricGroup(squares)
+    r = G([tuple(range(1, squares + 1))])
+    if origami == "row":
+        u = G([(i, i + 1) for i in range(1, squares, 2)])
+    elif origami == "one-cylinder":
+        u = G([(1, 2)])
+    else:
+        raise ValueError(f"unknown origami {origami}")
+
+    O = GL2ROrbitClosure(translation_surfaces.origami(r, u).erase_marked_points())
+    return max(O.decomposition((1, 0)).components(), key=lambda component: len(component.perimeter()))
+
+
+def payload_bytes(payload):
+    r"""
+    Return the number of bytes needed to send `payload` (the value of a
+    synced trait) to the frontend.
+    """
+    if payload is None:
+        return 0
+    if isinstance(payload, str):
+        return len(payload.encode("utf-8"))
+    if isinstance(payload, memoryview):
+        return payload.nbytes
+    if isinstance(payload, dict):
+        return sum(payload_bytes(value) for value in payload.values())
+    if isinstance(payload, (list, tuple)):
+        return sum(payload_bytes(item) for item in payload)
+
+    import json
+    return len(json.dumps(payload))
+
+
+def clear_caches():
+    r"""
+    Forget all conversions and encodings so that the next widget is created
+    from scratch.
+    """
+    from ipyvue_flatsurf.encoding.cache import cache_clear
+    from ipyvue_flatsurf import conversion
+
+    cache_clear()
+    conversion._conversions.clear()
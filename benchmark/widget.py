@@ -0,0 +1,77 @@
+r"""
+Benchmarks for creating widgets, i.e., what happens when a surface is
+displayed in a notebook.
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from benchmark.surfaces import SURFACES, surface, decomposition, clear_caches, payload_bytes
+
+
+def widget_payload_bytes(widget):
+    r"""
+    Return the number of bytes of the synced traits of `widget` that carry
+    encoded flatsurf objects.
+    """
+    return sum(payload_bytes(getattr(widget, trait)) for trait in ["triangulation_prop", "triangulation_patch_prop", "flow_components_prop", "saddle_connections_prop", "saddle_connection_table_prop", "paths_prop"])
+
+
+class Widget:
+    params = [SURFACES, ["yaml", "json", "binary"]]
+    param_names = ["surface", "codec"]
+
+    def setup(self, surface_, codec):
+        self.surface = surface(surface_)
+        self.decomposition = decomposition(surface_)
+
+    def time_surface(self, surface, codec):
+        from ipyvue_flatsurf import Widget
+        clear_caches()
+        Widget(self.surface, codec=codec)
+
+    def time_surface_cached(self, surface, codec):
+        from ipyvue_flatsurf import Widget
+        Widget(self.surface, codec=codec)
+
+    def peakmem_surface(self, surface, codec):
+        from ipyvue_flatsurf import Widget
+        clear_caches()
+        Widget(self.surface, codec=codec)
+
+    def time_flow_decomposition(self, surface, codec):
+        from ipyvue_flatsurf import Widget
+        clear_caches()
+        Widget(self.decomposition, codec=codec)
+
+    def peakmem_flow_decomposition(self, surface, codec):
+        from ipyvue_flatsurf import Widget
+        clear_caches()
+        Widget(self.decomposition, codec=codec)
+
+    def track_surface_bytes(self, surface, codec):
+        from ipyvue_flatsurf import Widget
+        return widget_payload_bytes(Widget(self.surface, codec=codec))
+
+    track_surface_bytes.unit = "bytes"
+
+    def track_flow_decomposition_bytes(self, surface, codec):
+        from ipyvue_flatsurf import Widget
+        return widget_payload_bytes(Widget(self.decomposition, codec=codec))
+
+    track_flow_decomposition_bytes.unit = "bytes"
@@ -0,0 +1,283 @@
+r"""
+Serializes encoded flatsurf objects for transmission to the frontend.
+
+The modules in :mod:`ipyvue_flatsurf.encoding` turn flatsurf objects into
+primitive Python types. The codecs in this module turn such primitive types
+into what is actually synced to the vue-flatsurf frontend.
+
+EXAMPLES::
+
+    >>> from ipyvue_flatsurf.codec import get_codec
+    >>> get_codec("yaml").encode({"a": 1337})
+    'a: 1337'
+    >>> get_codec("json").encode({"a": 1337})
+    '{"a":1337}'
+    >>> get_codec("binary").encode({"a": 1337})
+    {'codec': 'binary', 'header': <memory at 0x...>, 'buffers': []}
+
+By default, widgets use the binary codec::
+
+    >>> get_codec()
+    BinaryCodec()
+
+The codec used by widgets that do not explicitly ask for a specific codec can
+be changed globally::
+
+    >>> from ipyvue_flatsurf.codec import set_default_codec
+    >>> set_default_codec("yaml")
+    >>> get_codec().name
+    'yaml'
+    >>> set_default_codec("binary")
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+import json
+
+
+class Codec:
+    r"""
+    Abstract base class for the codecs that turn primitive Python objects into
+    the payload of a synced trait.
+    """
+    name = None
+
+    # Whether this codec can transmit NumPy arrays as raw binary data. If
+    # set, widgets send columnar encodings of the triangulation.
+    binary = False
+
+    def encode(self, x):
+        r"""
+        Return `x` in a form that can be assigned to a synced trait.
+        """
+        raise NotImplementedError("this codec does not implement encode() yet")
+
+    def to_json(self, payload):
+        r"""
+        Return the `payload` produced by :meth:`encode` in a form that can be
+        sent as JSON in a custom comm message.
+
+        EXAMPLES::
+
+            >>> get_codec("json").to_json('{"a":1337}')
+            '{"a":1337}'
+
+        """
+        return payload
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class YAMLCodec(Codec):
+    r"""
+    Serializes objects as YAML strings.
+
+    This is the format that vue-flatsurf parses natively. It is kept for
+    compatibility but it is much slower than the other codecs.
+
+    EXAMPLES::
+
+        >>> YAMLCodec().encode({"a": [1, 2]})
+        'a:\n- 1\n- 2'
+
+    """
+    name = "yaml"
+
+    def __init__(self):
+        from ruamel.yaml import YAML
+        self._yaml = YAML()
+
+    def encode(self, x):
+        if not isinstance(x, dict):
+            raise NotImplementedError("Cannot convert this object to YAML yet.")
+
+        from io import StringIO
+        buffer = StringIO()
+        self._yaml.dump(x, buffer)
+        return buffer.getvalue().strip()
+
+
+class JSONCodec(Codec):
+    r"""
+    Serializes objects as compact JSON strings.
+
+    Since JSON is a subset of YAML, vue-flatsurf can parse these strings
+    without any changes to the frontend.
+
+    EXAMPLES::
+
+        >>> JSONCodec().encode({"a": [1, 2]})
+        '{"a":[1,2]}'
+
+    """
+    name = "json"
+
+    def encode(self, x):
+        return json.dumps(x, separators=(",", ":"))
+
+
+class BinaryCodec(Codec):
+    r"""
+    Serializes objects as binary buffers.
+
+    The payload is a dict whose ``header`` is UTF-8 encoded JSON. NumPy
+    arrays are not part of the header. They are replaced by a reference into
+    ``buffers`` which holds their raw little-endian data. The ipywidgets
+    machinery sends the header and the buffers as binary buffers alongside the
+    comm message instead of escaping them into the JSON of the message itself.
+    The frontend decodes them again before handing them to vue-flatsurf.
+
+    EXAMPLES::
+
+        >>> payload = BinaryCodec().encode({"a": [1, 2]})
+        >>> bytes(payload["header"])
+        b'{"a":[1,2]}'
+
+    ::
+
+        >>> import numpy
+        >>> payload = BinaryCodec().encode({"a": numpy.array([[1., 2.]])})
+        >>> bytes(payload["header"])
+        b'{"a":{"$array":0,"dtype":"float64","shape":[1,2]}}'
+        >>> bytes(payload["buffers"][0])
+        b'\x00\x00\x00\x00\x00\x00\xf0?\x00\x00\x00\x00\x00\x00\x00@'
+
+    """
+    name = "binary"
+    binary = True
+
+    def encode(self, x):
+        buffers = []
+        header = json.dumps(self._extract_arrays(x, buffers), separators=(",", ":")).encode("utf-8")
+        return {"codec": self.name, "header": memoryview(header), "buffers": buffers}
+
+    def to_json(self, payload):
+        r"""
+        Return the `payload` produced by :meth:`encode` in a form that can be
+        sent as JSON in a custom comm message.
+
+        The frontend only gets binary buffers with trait updates, so the
+        header and the buffers are base64 encoded here.
+
+        EXAMPLES::
+
+            >>> codec = BinaryCodec()
+            >>> codec.to_json(codec.encode({"a": [1, 2]}))
+            {'codec': 'binary', 'base64': True, 'header': 'eyJhIjpbMSwyXX0=', 'buffers': []}
+
+        """
+        from base64 import b64encode
+        return {
+            "codec": self.name,
+            "base64": True,
+            "header": b64encode(payload["header"]).decode("ascii"),
+            "buffers": [b64encode(buffer).decode("ascii") for buffer in payload["buffers"]],
+        }
+
+    @classmethod
+    def _extract_arrays(cls, x, buffers):
+        r"""
+        Return `x` with all NumPy arrays replaced by references to `buffers`.
+
+        EXAMPLES::
+
+            >>> import numpy
+            >>> buffers = []
+            >>> BinaryCodec._extract_arrays([numpy.zeros(3, dtype=numpy.int32)], buffers)
+            [{'$array': 0, 'dtype': 'int32', 'shape': [3]}]
+            >>> len(buffers[0])
+            12
+
+        """
+        if isinstance(x, dict):
+            return {key: cls._extract_arrays(value, buffers) for (key, value) in x.items()}
+        if isinstance(x, (list, tuple)):
+            return [cls._extract_arrays(value, buffers) for value in x]
+        if hasattr(x, "__array_interface__"):
+            import numpy
+            array = numpy.ascontiguousarray(x, dtype=x.dtype.newbyteorder("<"))
+            buffers.append(memoryview(array).cast("B"))
+            return {"$array": len(buffers) - 1, "dtype": x.dtype.name, "shape": list(x.shape)}
+        return x
+
+
+codecs = {
+    YAMLCodec.name: YAMLCodec,
+    JSONCodec.name: JSONCodec,
+    BinaryCodec.name: BinaryCodec,
+}
+
+_default = BinaryCodec.name
+_instances = {}
+
+
+def get_codec(codec=None):
+    r"""
+    Return the codec called `codec`.
+
+    If `codec` is ``None``, returns the default codec, see
+    :func:`set_default_codec`. If `codec` is already a :class:`Codec`, it is
+    returned unchanged.
+
+    EXAMPLES::
+
+        >>> get_codec("binary")
+        BinaryCodec()
+
+    ::
+
+        >>> get_codec("xml")
+        Traceback (most recent call last):
+        ...
+        ValueError: unknown codec 'xml', must be one of yaml, json, binary
+
+    """
+    if isinstance(codec, Codec):
+        return codec
+
+    if codec is None:
+        codec = _default
+
+    if codec not in codecs:
+        raise ValueError(f"unknown codec '{codec}', must be one of {', '.join(codecs)}")
+
+    if codec not in _instances:
+        _instances[codec] = codecs[codec]()
+
+    return _instances[codec]
+
+
+def set_default_codec(codec):
+    r"""
+    Set the codec used by widgets that do not explicitly request a codec.
+
+    This only affects widgets created after this call.
+
+    EXAMPLES::
+
+        >>> set_default_codec("json")
+        >>> get_codec()
+        JSONCodec()
+        >>> set_default_codec("binary")
+
+    """
+    global _default
+    _default = get_codec(codec).name
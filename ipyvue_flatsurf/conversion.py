@@ -0,0 +1,96 @@
+r"""
+Converts sage-flatsurf surfaces to pyflatsurf triangulations.
+
+The conversion of a sage-flatsurf surface to a pyflatsurf FlatTriangulation
+can be costly, in particular for translation covers of billiards where it
+also needs to convert the exact coordinates to a different ring. Since
+widgets are created every time a surface is displayed, we keep the
+conversions of immutable surfaces around as long as the surfaces are alive.
+
+EXAMPLES::
+
+    >>> from flatsurf import translation_surfaces
+    >>> S = translation_surfaces.mcmullen_L(1, 1, 1, 1)
+    >>> T = to_pyflatsurf(S)
+
+Converting the same surface again, is essentially free. However, we return
+a copy of the original conversion since triangulations are mutable::
+
+    >>> to_pyflatsurf(S) is T
+    False
+    >>> to_pyflatsurf(S) == T
+    True
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+# Maps the id() of a surface to a weak reference to the surface and its
+# conversion. Entries are removed when the surface is garbage collected.
+_conversions = {}
+
+
+def to_pyflatsurf(surface):
+    r"""
+    Return the pyflatsurf FlatTriangulation underlying the sage-flatsurf
+    `surface`.
+
+    If `surface` is immutable, the conversion is computed only once and
+    copies of it are returned for further calls. Mutable surfaces can change
+    after the conversion, so they are converted again every time.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces
+        >>> S = translation_surfaces.square_torus()
+        >>> to_pyflatsurf(S)
+        FlatTriangulationCombinatorial(vertices = (1, -3, 2, -1, 3, -2), faces = (1, 2, 3)(-1, -2, -3)) with vectors {1: (1, 0), 2: (0, 1), 3: (-1, -1)}
+
+    """
+    from ipyvue_flatsurf.instrumentation import stage
+    with stage("to_pyflatsurf"):
+        return _to_pyflatsurf(surface)
+
+
+def _to_pyflatsurf(surface):
+    r"""
+    Return the pyflatsurf FlatTriangulation underlying the sage-flatsurf
+    `surface`, see :func:`to_pyflatsurf`.
+    """
+    from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+
+    if surface.is_mutable():
+        return to_pyflatsurf(surface)
+
+    key = id(surface)
+
+    cached = _conversions.get(key)
+    if cached is None or cached[0]() is not surface:
+        import weakref
+
+        try:
+            ref = weakref.ref(surface, lambda _: _conversions.pop(key, None))
+        except TypeError:
+            # This surface does not support weak references so we cannot
+            # tell when it is gone.
+            return to_pyflatsurf(surface)
+
+        cached = _conversions[key] = (ref, to_pyflatsurf(surface))
+
+    return cached[1].clone()
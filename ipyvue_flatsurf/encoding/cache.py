@@ -0,0 +1,427 @@
+r"""
+A size-bounded cache for the encodings of flatsurf objects.
+
+Displaying the same surface repeatedly, e.g., because a cell that ends with
+a surface is executed again, would otherwise encode the same triangulation
+and flow components again every time.
+
+EXAMPLES::
+
+    >>> from flatsurf import translation_surfaces
+    >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+    >>> T = to_pyflatsurf(translation_surfaces.square_torus())
+
+    >>> from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
+    >>> cache_clear()
+    >>> cached(encode_flat_triangulation, T)
+    {'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}}
+    >>> cache_info()
+    CacheInfo(hits=0, misses=1, entries=1, bytes=..., maxsize=1024, maxbytes=67108864)
+
+Encoding an identical triangulation again is a cache hit, even if it is a
+different object::
+
+    >>> T = to_pyflatsurf(translation_surfaces.square_torus())
+    >>> cached(encode_flat_triangulation, T)
+    {'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}}
+    >>> cache_info().hits
+    1
+
+The limits of the cache can be configured::
+
+    >>> cache_configure(maxsize=16, maxbytes=2**20)
+    >>> cache_info()
+    CacheInfo(hits=1, misses=1, entries=1, bytes=..., maxsize=16, maxbytes=1048576)
+    >>> cache_configure(maxsize=1024, maxbytes=2**26)
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+import threading
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "entries", "bytes", "maxsize", "maxbytes"])
+
+
+class EncodingCache:
+    r"""
+    A least-recently-used cache of encoded objects whose total size is
+    bounded by `maxsize` entries and approximately `maxbytes` bytes.
+
+    The cached encodings are shared between all callers. They must not be
+    modified.
+
+    EXAMPLES::
+
+        >>> cache = EncodingCache(maxsize=2)
+        >>> cache.get("a", lambda: [1])
+        [1]
+        >>> cache.get("b", lambda: [2])
+        [2]
+        >>> cache.get("a", lambda: [3])
+        [1]
+
+    Since ``"b"`` was used least recently, it gets evicted when the cache is
+    full::
+
+        >>> cache.get("c", lambda: [4])
+        [4]
+        >>> cache.get("b", lambda: [5])
+        [5]
+        >>> cache.info()
+        CacheInfo(hits=1, misses=4, entries=2, bytes=..., maxsize=2, maxbytes=67108864)
+
+    """
+
+    def __init__(self, maxsize=1024, maxbytes=2**26):
+        self._maxsize = maxsize
+        self._maxbytes = maxbytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.RLock()
+
+    def get(self, key, compute, refs=()):
+        r"""
+        Return the value cached for `key`; if there is no such value, call
+        `compute` to create it and cache it.
+
+        The objects `refs` are kept alive while the value is cached. This
+        makes sure that the ``id()`` of such an object can be part of `key`.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key][0]
+            self._misses += 1
+
+        value = compute()
+        size = _sizeof(value)
+
+        with self._lock:
+            if key not in self._entries and size <= self._maxbytes:
+                self._entries[key] = (value, size, tuple(refs))
+                self._bytes += size
+                self._evict()
+
+        return value
+
+    def put(self, key, value, refs=()):
+        r"""
+        Cache `value` for `key`, replacing any value cached before.
+
+        EXAMPLES::
+
+            >>> cache = EncodingCache()
+            >>> cache.put("a", [1])
+            >>> cache.get("a", lambda: [2])
+            [1]
+
+        """
+        size = _sizeof(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size <= self._maxbytes:
+                self._entries[key] = (value, size, tuple(refs))
+                self._bytes += size
+                self._evict()
+
+    def __contains__(self, key):
+        r"""
+        Return whether a value is cached for `key`.
+
+        EXAMPLES::
+
+            >>> cache = EncodingCache()
+            >>> cache.put("a", [1])
+            >>> "a" in cache
+            True
+            >>> "b" in cache
+            False
+
+        """
+        with self._lock:
+            return key in self._entries
+
+    def configure(self, maxsize=None, maxbytes=None):
+        r"""
+        Change the limits of this cache and evict entries that exceed them.
+
+        EXAMPLES::
+
+            >>> cache = EncodingCache()
+            >>> cache.get("a", lambda: [1])
+            [1]
+            >>> cache.configure(maxsize=0)
+            >>> cache.info().entries
+            0
+
+        """
+        with self._lock:
+            if maxsize is not None:
+                self._maxsize = maxsize
+            if maxbytes is not None:
+                self._maxbytes = maxbytes
+            self._evict()
+
+    def clear(self):
+        r"""
+        Remove all entries from this cache and reset its statistics.
+
+        EXAMPLES::
+
+            >>> cache = EncodingCache()
+            >>> cache.get("a", lambda: [1])
+            [1]
+            >>> cache.clear()
+            >>> cache.info()
+            CacheInfo(hits=0, misses=0, entries=0, bytes=0, maxsize=1024, maxbytes=67108864)
+
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def info(self):
+        r"""
+        Return statistics about this cache.
+        """
+        with self._lock:
+            return CacheInfo(hits=self._hits, misses=self._misses, entries=len(self._entries), bytes=self._bytes, maxsize=self._maxsize, maxbytes=self._maxbytes)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self._maxsize or self._bytes > self._maxbytes):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+
+def _sizeof(x):
+    r"""
+    Return an estimate of the memory used by the encoded object `x` in bytes.
+
+    EXAMPLES::
+
+        >>> _sizeof({"a": [1, 2]}) > _sizeof({"a": [1]})
+        True
+
+    """
+    import sys
+
+    if hasattr(x, "__array_interface__"):
+        return sys.getsizeof(x) + (0 if x.base is None else x.nbytes)
+    if isinstance(x, dict):
+        return sys.getsizeof(x) + sum(_sizeof(key) + _sizeof(value) for (key, value) in x.items())
+    if isinstance(x, (list, tuple)):
+        return sys.getsizeof(x) + sum(_sizeof(item) for item in x)
+    if hasattr(x, "__dict__"):
+        return sys.getsizeof(x) + _sizeof(vars(x))
+    return sys.getsizeof(x)
+
+
+def content_hash(x):
+    r"""
+    Return a digest of the string representation of `x`.
+
+    For the flatsurf objects we encode, the string representation is computed
+    efficiently in C++ and it determines the object completely, e.g., it
+    contains the exact vectors of all the edges of a triangulation.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces
+        >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+        >>> T = to_pyflatsurf(translation_surfaces.square_torus())
+        >>> content_hash(T) == content_hash(T.clone())
+        True
+
+    """
+    memo = getattr(_content_hashes, "memo", None)
+    if memo is not None and id(x) in memo:
+        return memo[id(x)][1]
+
+    import hashlib
+    digest = hashlib.blake2b(repr(x).encode("utf-8"), digest_size=16).digest()
+
+    if memo is not None:
+        memo[id(x)] = (x, digest)
+
+    return digest
+
+
+_content_hashes = threading.local()
+
+
+@contextmanager
+def memoized_content_hashes():
+    r"""
+    Return a context in which :func:`content_hash` is computed only once for
+    each object.
+
+    This is useful when many saddle connections of the same surface are
+    looked up in the cache since the key of each connection contains the
+    hash of its surface. The objects must not change in this context.
+
+    EXAMPLES::
+
+        >>> with memoized_content_hashes():
+        ...     content_hash([1]) == content_hash([1])
+        True
+
+    """
+    if getattr(_content_hashes, "memo", None) is not None:
+        yield
+        return
+
+    _content_hashes.memo = {}
+    try:
+        yield
+    finally:
+        _content_hashes.memo = None
+
+
+def cache_key(x, refs):
+    r"""
+    Return a key that identifies the argument `x` of an encoding function.
+
+    Flat triangulations, flow components, and saddle connections are
+    identified by their content. Flags and numbers identify themselves.
+    Other objects, e.g., deformations, are identified by their identity and
+    added to `refs` so that they are kept alive as long as the key is used in
+    the cache. A
+    :class:`ipyvue_flatsurf.encoding.flow_component_encoding.Pullback` is
+    identified by its deformation since it produces the same encodings.
+
+    EXAMPLES::
+
+        >>> refs = []
+        >>> cache_key(None, refs)
+        >>> cache_key(True, refs)
+        True
+        >>> cache_key([1337], refs)
+        ('id', ...)
+        >>> refs
+        [[1337]]
+
+    """
+    if x is None or isinstance(x, (bool, int, float, str)):
+        return x
+
+    kind = str(type(x))
+    if "flatsurf.FlatTriangulation<" in kind:
+        return ("triangulation", content_hash(x))
+    if "flatsurf.FlowComponent<" in kind:
+        return ("component", content_hash(x.decomposition().surface()), repr(x))
+    if "flatsurf.SaddleConnection<" in kind:
+        return ("connection", content_hash(x.surface()), repr(x))
+
+    from ipyvue_flatsurf.encoding.flow_component_encoding import Pullback
+    if isinstance(x, Pullback):
+        return cache_key(x.deformation, refs)
+
+    refs.append(x)
+    return ("id", id(x))
+
+
+def cached(encode, *args):
+    r"""
+    Return ``encode(*args)`` from the module-level encoding cache.
+
+    If the value is not cached yet, computing it is recorded as a stage
+    named after `encode` for instrumented widgets, see
+    :mod:`ipyvue_flatsurf.instrumentation`.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+        >>> S = translation_surfaces.square_torus()
+        >>> O = GL2ROrbitClosure(S)
+        >>> D = next(O.decompositions(bound=64))
+        >>> component = D.components()[0]
+
+        >>> from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+        >>> cached(encode_flow_component, component, None) is cached(encode_flow_component, component, None)
+        True
+
+    """
+    from ipyvue_flatsurf.instrumentation import stage
+
+    def compute():
+        with stage(encode.__name__):
+            return encode(*args)
+
+    key, refs = encoding_key(encode, *args)
+    return cache.get(key, compute, refs=refs)
+
+
+def encoding_key(encode, *args):
+    r"""
+    Return the key under which ``encode(*args)`` is cached and the objects
+    that need to be kept alive while that key is in use, see
+    :func:`cache_key`.
+
+    EXAMPLES::
+
+        >>> from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
+        >>> encoding_key(encode_flat_triangulation, None)
+        (('ipyvue_flatsurf.encoding.flat_triangulation_encoding', 'encode_flat_triangulation', None), [])
+
+    """
+    refs = []
+    key = (encode.__module__, encode.__qualname__) + tuple(cache_key(arg, refs) for arg in args)
+    return key, refs
+
+
+cache = EncodingCache()
+
+
+def cache_info():
+    r"""
+    Return statistics about the module-level encoding cache.
+    """
+    return cache.info()
+
+
+def cache_clear():
+    r"""
+    Remove all entries from the module-level encoding cache.
+    """
+    cache.clear()
+
+
+def cache_configure(maxsize=None, maxbytes=None):
+    r"""
+    Change the limits of the module-level encoding cache.
+
+    INPUT:
+
+    - ``maxsize`` -- the maximum number of cached encodings
+
+    - ``maxbytes`` -- the approximate maximum number of bytes used by the cached encodings
+
+    """
+    cache.configure(maxsize=maxsize, maxbytes=maxbytes)
@@ -0,0 +1,145 @@
+r"""
+Chooses how much detail of a surface is sent to the frontend.
+
+Showing a triangulation with thousands of triangles and all its flow
+components in vue-flatsurf can make a notebook unresponsive. Widgets
+therefore show large surfaces at a lower level of detail:
+
+- ``"full"`` -- everything is sent to vue-flatsurf.
+
+- ``"reduced"`` -- the surface is shown in vue-flatsurf without edge labels
+  and flow components are sent progressively, see
+  :meth:`ipyvue_flatsurf.widgets.vue_flatsurf_widget.VueFlatsurfWidget.set_flow_components`.
+
+- ``"overview"`` -- a static picture is rendered in the kernel instead, see
+  :mod:`ipyvue_flatsurf.svg`. Faces that are glued in the layout are merged
+  into polygons, labels are dropped, and saddle connections are drawn as
+  straight segments across the merged polygons instead of crossing each
+  edge. A region of the surface can still be shown in full detail.
+
+vue-flatsurf needs every triangle of the triangulation and every crossing of
+a saddle connection, so faces are only merged and crossings only dropped in
+an overview. At the other levels, only the transfer of crossings is
+compressed, see :func:`ipyvue_flatsurf.encoding.saddle_connection_encoding.compress_crossings`.
+
+EXAMPLES::
+
+    >>> get_detail(halfEdges=6)
+    'full'
+    >>> get_detail(halfEdges=10**6)
+    'overview'
+
+An explicitly requested level of detail takes precedence::
+
+    >>> get_detail("full", halfEdges=10**6)
+    'full'
+
+The budget that decides the level of detail automatically can be changed
+globally::
+
+    >>> set_detail_budget(4)
+    >>> get_detail(halfEdges=6)
+    'reduced'
+    >>> set_detail_budget(4096)
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+LEVELS = ["full", "reduced", "overview"]
+
+# The number of half edges up to which surfaces are shown in full detail.
+# Up to eight times as many half edges are shown at reduced detail.
+_budget = 4096
+
+
+def get_detail(detail=None, halfEdges=0, budget=None):
+    r"""
+    Return the level of detail for a triangulation with `halfEdges` half
+    edges.
+
+    If `detail` is ``None``, the level is chosen from the `budget`, by
+    default the one set with :func:`set_detail_budget`.
+
+    EXAMPLES::
+
+        >>> get_detail("everything")
+        Traceback (most recent call last):
+        ...
+        ValueError: unknown level of detail 'everything', must be one of full, reduced, overview
+
+    ::
+
+        >>> get_detail(halfEdges=6, budget=4)
+        'reduced'
+
+    """
+    if detail is None:
+        if budget is None:
+            budget = _budget
+        if halfEdges <= budget:
+            return "full"
+        if halfEdges <= 8 * budget:
+            return "reduced"
+        return "overview"
+
+    if detail not in LEVELS:
+        raise ValueError(f"unknown level of detail '{detail}', must be one of {', '.join(LEVELS)}")
+
+    return detail
+
+
+def set_detail_budget(halfEdges):
+    r"""
+    Show surfaces with up to `halfEdges` half edges in full detail in widgets
+    that do not explicitly request a level of detail.
+
+    This only affects widgets created after this call, see
+    :func:`get_detail_budget`.
+
+    EXAMPLES::
+
+        >>> set_detail_budget(-1)
+        Traceback (most recent call last):
+        ...
+        ValueError: budget must be non-negative but got -1
+
+    """
+    if halfEdges < 0:
+        raise ValueError(f"budget must be non-negative but got {halfEdges}")
+
+    global _budget
+    _budget = halfEdges
+
+
+def get_detail_budget():
+    r"""
+    Return the number of half edges up to which surfaces are shown in full
+    detail, see :func:`set_detail_budget`.
+
+    Widgets remember the budget when they are created, so that changing it
+    does not change the level of detail of existing widgets.
+
+    EXAMPLES::
+
+        >>> get_detail_budget()
+        4096
+
+    """
+    return _budget
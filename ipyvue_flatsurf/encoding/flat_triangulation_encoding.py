@@ -46,3 +46,119 @@ def encode_flat_triangulation(triangulation):
             } for he in triangulation.halfEdges() if he.id() > 0
         }
     }
+
+
+def encode_flat_triangulation_columnar(triangulation):
+    r"""
+    Return the flat triangulation encoded as a pair of NumPy arrays.
+
+    The ``vertexPermutation`` maps the index of each half edge to the index of
+    the next half edge at its vertex in counterclockwise order. The index of
+    a half edge with id `i` is `2(|i| - 1)` if `i` is positive and `2(|i| - 1) +
+    1` otherwise.
+
+    The ``vectors`` hold the vector of the half edge with id `i` in row `i - 1`
+    for all positive `i`.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces
+        >>> S = translation_surfaces.square_torus()
+
+        >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+        >>> T = to_pyflatsurf(S)
+
+        >>> encoded = encode_flat_triangulation_columnar(T)
+        >>> encoded["vertexPermutation"]
+        array([5, 4, 1, 0, 3, 2], dtype=int32)
+        >>> encoded["vectors"]
+        array([[ 1.,  0.],
+               [ 0.,  1.],
+               [-1., -1.]])
+
+    """
+    import numpy
+
+    def index(id):
+        return 2 * (id - 1) if id > 0 else 2 * (-id - 1) + 1
+
+    edges = list(triangulation.edges())
+
+    permutation = numpy.empty(2 * len(edges), dtype=numpy.int32)
+    for vertex in triangulation.vertices():
+        cycle = [index(he.id()) for he in triangulation.atVertex(vertex)]
+        permutation[cycle] = cycle[1:] + cycle[:1]
+
+    vectors = numpy.empty((len(edges), 2), dtype=numpy.float64)
+    for edge in edges:
+        vector = triangulation.fromHalfEdge(edge.positive())
+        vectors[edge.positive().id() - 1] = (float(vector.x()), float(vector.y()))
+
+    return {
+        "vertexPermutation": permutation,
+        "vectors": vectors,
+    }
+
+
+def diff_flat_triangulation_columnar(old, new, limit=.25):
+    r"""
+    Return a patch that turns the columnar encoding `old` into `new`.
+
+    The patch lists the entries of the vertex permutation and the rows of the
+    vectors that changed, see :func:`encode_flat_triangulation_columnar`.
+
+    Returns ``None`` if the triangulations have a different number of edges
+    or if more than a fraction `limit` of the entries changed; in these cases
+    it is cheaper to send `new` in full.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces
+        >>> S = translation_surfaces.square_torus()
+
+        >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+        >>> T = to_pyflatsurf(S)
+        >>> old = encode_flat_triangulation_columnar(T)
+
+    Without any changes, the patch is empty::
+
+        >>> patch = diff_flat_triangulation_columnar(old, old)
+        >>> patch["vectors"]
+        {'indices': array([], dtype=int32), 'values': array([], shape=(0, 2), dtype=float64)}
+
+    Flipping an edge changes its vector and the vertex permutation::
+
+        >>> from pyflatsurf import flatsurf
+        >>> T.flip(flatsurf.HalfEdge(3))
+        >>> new = encode_flat_triangulation_columnar(T)
+        >>> patch = diff_flat_triangulation_columnar(old, new, limit=1)
+        >>> patch["vectors"]["indices"]
+        array([2], dtype=int32)
+
+    On such a small surface, sending the entire surface is cheaper though::
+
+        >>> diff_flat_triangulation_columnar(old, new) is None
+        True
+
+    """
+    import numpy
+
+    if old["vectors"].shape != new["vectors"].shape:
+        return None
+
+    permutation = numpy.flatnonzero(old["vertexPermutation"] != new["vertexPermutation"]).astype(numpy.int32)
+    vectors = numpy.flatnonzero((old["vectors"] != new["vectors"]).any(axis=1)).astype(numpy.int32)
+
+    if len(permutation) + 2 * len(vectors) > limit * (len(new["vertexPermutation"]) + new["vectors"].size):
+        return None
+
+    return {
+        "vertexPermutation": {
+            "indices": permutation,
+            "values": new["vertexPermutation"][permutation],
+        },
+        "vectors": {
+            "indices": vectors,
+            "values": new["vectors"][vectors],
+        },
+    }
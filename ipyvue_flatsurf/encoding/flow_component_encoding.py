@@ -20,14 +20,17 @@ Encodes a flatsurf FlowComponent in a format that is understood by vue-flatsurf.
 #  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
 # ********************************************************************
 
-from dataclasses import dataclass
-from functools import cache
+from functools import cached_property
 
 
-def encode_flow_component(component, deformation=None):
+def encode_flow_component(component, deformation=None, compress=False):
     r"""
     Return the flow component encoded as a primitive type.
 
+    If `compress` is set, the crossings of the saddle connections on the
+    perimeter are compressed, see
+    :func:`ipyvue_flatsurf.encoding.saddle_connection_encoding.encode_saddle_connection`.
+
     EXAMPLES::
 
         >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
@@ -53,8 +56,14 @@ def encode_flow_component(component, deformation=None):
         >>> encode_flow_component(component, deformation=deformation.section())
         {'cylinder': True, 'perimeter': [...], 'inside': [1, -1, 3, -3, 4, -4, 6, -6, 7, -7, 8, -8, 9, -9]}
 
+    The `deformation` can also be a :class:`Pullback` which then remembers
+    the saddle connections it pulled back for the next component::
+
+        >>> pullback = Pullback(deformation.section())
+        >>> encoded = [encode_flow_component(component, pullback) for component in D.components()]
+
     """
-    return Encoder(component, deformation).encoded
+    return Encoder(component, deformation, compress=compress).encoded
 
 
 class Encoder:
@@ -62,9 +71,17 @@ class Encoder:
     Helper structure to encode a flow component as a promitive type.
     """
 
-    def __init__(self, component, deformation=None):
+    def __init__(self, component, deformation=None, compress=False):
+        self._pullback = None
+        if isinstance(deformation, Pullback):
+            self._pullback = deformation
+            deformation = deformation.deformation
+        elif deformation is not None:
+            self._pullback = Pullback(deformation)
+
         self.component = component
         self.deformation = deformation
+        self.compress = compress
 
         if self.deformation is None:
             self.surface = self.component.decomposition().surface()
@@ -76,32 +93,69 @@ class Encoder:
         r"""
         Return an encoded version of this flow component.
         """
-        start, end = self.in_component
+        from ipyvue_flatsurf.instrumentation import stage
 
-        inside = [halfEdge for halfEdge in self.surface.halfEdges() if start[halfEdge] and end[halfEdge] and not any(isinstance(touch, Crossing) for touch in self.touches[halfEdge])]
+        # We force the computation of the individual passes here, so that
+        # each of them is timed separately for instrumented widgets.
+        with stage("Encoder.pullback"):
+            self.steps
+        with stage("Encoder.touches"):
+            self.touches
+        with stage("Encoder.in_component"):
+            start, end = self.in_component
 
-        touches = {halfEdge: [(touch.step, touch.n, i) for (i, touch) in enumerate(self.touches[halfEdge])] for halfEdge in self.touches}
+        inside = [halfEdge for halfEdge in self.surface.halfEdges() if start[halfEdge] and end[halfEdge] and not any(isinstance(touch, Crossing) for touch in self.touches[halfEdge])]
 
-        touches = {step: sorted([(touch[1], halfEdge.id(), touch[2]) for halfEdge in touches for touch in touches[halfEdge] if touch[0] == step]) for connection in self.perimeter for step in self.pullback(connection.saddleConnection())}
+        with stage("Encoder.touches_by_step"):
+            touches = self.touches_by_step
 
         from ipyvue_flatsurf.encoding.saddle_connection_encoding import encode_saddle_connection
+        from ipyvue_flatsurf.encoding.cache import cached, memoized_content_hashes
 
-        return {
-            "cylinder": bool(self.component.cylinder()),
-            "perimeter": [dict(
+        # Connections that are also shown elsewhere, e.g., on the perimeter
+        # of another component or in a path, are only encoded once.
+        with memoized_content_hashes():
+            perimeter = [dict(
                 vertical=connection.vertical(),
                 boundary=connection.boundary(),
                 touches=[{
-                    "halfEdge": touch[1],
-                    "index": touch[2],
-                } for touch in touches[step]],
-                **encode_saddle_connection(step),
-            ) for connection in self.perimeter for step in self.pullback(connection.saddleConnection())],
+                    "halfEdge": halfEdge,
+                    "index": index,
+                } for (halfEdge, index) in touches[i]],
+                **cached(encode_saddle_connection, step, self.compress),
+            ) for (i, (connection, step)) in enumerate(self.steps)]
+
+        return {
+            "cylinder": bool(self.component.cylinder()),
+            "perimeter": perimeter,
             "inside": [halfEdge.id() for halfEdge in inside],
         }
 
-    @property
-    @cache
+    @cached_property
+    def steps(self):
+        r"""
+        Return the saddle connections that make up the perimeter of this
+        component in the original surface (before deforming it), together
+        with the perimeter connection they belong to.
+
+        Touchings and crossings refer to these steps by their index in this
+        list.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+            >>> S = translation_surfaces.square_torus()
+            >>> O = GL2ROrbitClosure(S)
+            >>> D = next(O.decompositions(bound=64))
+            >>> component = D.components()[0]
+
+            >>> Encoder(component).steps
+            [(3, 3), (1, 1), (-3, -3), (-1, -1)]
+
+        """
+        return [(connection, step) for connection in self.perimeter for step in self.pullback(connection.saddleConnection())]
+
+    @cached_property
     def touches(self):
         r"""
         Return for each half edge the touches and crossings of a flow
@@ -117,7 +171,7 @@ class Encoder:
 
             >>> from pyflatsurf import flatsurf
             >>> Encoder(component).touches[flatsurf.HalfEdge(1)]
-            [Touching(n=1, step=1, out=True, vector=(1, 0)), Touching(n=2, step=-1, out=False, vector=(1, 0))]
+            [Touching(n=1, step=1, out=True), Touching(n=2, step=3, out=False)]
 
         ::
 
@@ -129,40 +183,172 @@ class Encoder:
             >>> from ipyvue_flatsurf.encoding.flow_component_encoding import Encoder
             >>> encoder = Encoder(component)
             >>> encoder.touches[flatsurf.HalfEdge(1)]
-            [Touching(n=2, step=-1, out=False, vector=(1, 0))]
+            [Touching(n=2, step=3, out=False)]
+
+        The order of the touchings and crossings is the one given by the
+        exact comparison in :func:`_compare`::
+
+            >>> from functools import cmp_to_key
+            >>> def exactly_sorted(encoder, touches):
+            ...     exact = sorted([(touch, encoder.exact(touch)) for touch in touches], key=cmp_to_key(_compare))
+            ...     return [touch for (touch, _) in exact]
+
+            >>> for direction in [(1, 0), (0, 1), (1, 2), (3, 1)]:
+            ...     for component in O.decomposition(direction).components():
+            ...         encoder = Encoder(component)
+            ...         for (halfEdge, touches) in encoder.touches.items():
+            ...             assert touches == exactly_sorted(encoder, touches), (direction, halfEdge)
 
 
         """
+        import math
+
         touches = {halfEdge: [] for halfEdge in self.surface.halfEdges()}
 
+        # The half edges as floating point vectors to compute the sort keys of
+        # touchings.
+        vectors = {}
+
+        def touching(n, i, halfEdge, x, y, out):
+            if halfEdge not in vectors:
+                vector = self.surface.fromHalfEdge(halfEdge)
+                vectors[halfEdge] = (float(vector.x()), float(vector.y()))
+            ex, ey = vectors[halfEdge]
+
+            # Touchings are ordered by increasing counterclockwise angle from
+            # the half edge, see _compare().
+            key = math.atan2(ex * y - ey * x, ex * x + ey * y)
+            touches[halfEdge].append(Touching(n=n, step=i, out=out, key=key))
+
         # After this loop, touches[halfEdge] lists the crossings that enter or
         # leave at this half edge.
-        for connection in self.perimeter:
-            for step in self.pullback(connection.saddleConnection()):
-                n = 1
-                touches[step.source()].append(Touching(n=n, step=step, vector=step.vector(), out=True))
+        for (i, (connection, step)) in enumerate(self.steps):
+            x, y = float(step.vector().x()), float(step.vector().y())
 
-                assert len(step.path()) == len((-step).path())
-                for intersection, intersection_ in zip(step.path(), reversed((-step).path())):
-                    # It seems that this could be simplified if we had a HalfEdgeIntersection::operator-.
-                    assert intersection.halfEdge() == -intersection_.halfEdge()
+            n = 1
+            touching(n, i, step.source(), x, y, out=True)
 
-                    n += 1
-                    touches[intersection.halfEdge()].append(Crossing(n=n, step=step, intersection=intersection, out=False))
+            assert len(step.path()) == len((-step).path())
+            for intersection, intersection_ in zip(step.path(), reversed((-step).path())):
+                # It seems that this could be simplified if we had a HalfEdgeIntersection::operator-.
+                assert intersection.halfEdge() == -intersection_.halfEdge()
 
-                    n += 1
-                    touches[intersection_.halfEdge()].append(Crossing(n=n, step=step, intersection=intersection_, out=True))
+                # Crossings are ordered by their position along the half
+                # edge, see _compare().
+                n += 1
+                touches[intersection.halfEdge()].append(Crossing(n=n, step=i, out=False, key=float(intersection.at())))
 
                 n += 1
-                touches[step.target()].append(Touching(n=n, step=step, vector=-step.vector(), out=False))
+                touches[intersection_.halfEdge()].append(Crossing(n=n, step=i, out=True, key=float(intersection_.at())))
+
+            n += 1
+            touching(n, i, step.target(), -x, -y, out=False)
 
         # Sort the touchings and crossings at the half edges such that they are in
         # the order as they appear along the half edge.
         for halfEdge in touches:
-            touches[halfEdge].sort()
+            if len(touches[halfEdge]) > 1:
+                _sort(touches[halfEdge], self.exact)
 
         return touches
 
+    def exact(self, touch):
+        r"""
+        Return the exact data that determines the position of `touch` along
+        its half edge, i.e., the vector of the saddle connection for a
+        touching and the intersection with the half edge for a crossing.
+
+        These are not stored in the touchings and crossings themselves
+        since a long perimeter creates lots of them. They are only needed
+        when the floating point keys of two of them are too close to order
+        them. The intersections of a step with the half edges are computed
+        only once for all its crossings, see :attr:`_paths`.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+            >>> S = translation_surfaces.square_torus()
+            >>> O = GL2ROrbitClosure(S)
+            >>> D = next(O.decompositions(bound=64))
+            >>> component = D.components()[0]
+
+            >>> from pyflatsurf import flatsurf
+            >>> encoder = Encoder(component)
+            >>> encoder.exact(encoder.touches[flatsurf.HalfEdge(1)][0])
+            (1, 0)
+
+        """
+        step = self.steps[touch.step][1]
+
+        if isinstance(touch, Touching):
+            return step.vector() if touch.out else -step.vector()
+
+        if touch.step not in self._paths:
+            self._paths[touch.step] = (list(step.path()), list((-step).path()))
+        path, negative = self._paths[touch.step]
+
+        # The n of the crossings of a step are 2, 3 for the first
+        # intersection, 4, 5 for the second, …, see touches.
+        k = (touch.n - 2) // 2
+        if not touch.out:
+            return path[k]
+        return negative[len(negative) - 1 - k]
+
+    @cached_property
+    def _paths(self):
+        r"""
+        The intersections of the steps with the half edges by index of the
+        step, as computed by :meth:`exact`.
+
+        Ties are common when a perimeter contains a saddle connection and
+        its negative, e.g., in one-cylinder directions, since their
+        crossings are at the same points. Walking the path of a step again
+        for each tie would make encoding quadratic in the length of the
+        step.
+        """
+        return {}
+
+    @cached_property
+    def touches_by_step(self):
+        r"""
+        Return for each step the touchings and crossings it creates in the
+        order in which they are created, i.e., in the order of their ``n``.
+
+        Each touching or crossing is given as a pair of the id of the half
+        edge where it happens and its position in :attr:`touches` for that
+        half edge.
+
+        This makes a fixed number of passes over all touchings and crossings,
+        so it is linear in the length of the perimeter.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+            >>> S = translation_surfaces.square_torus()
+            >>> O = GL2ROrbitClosure(S)
+            >>> D = next(O.decompositions(bound=64))
+            >>> component = D.components()[0]
+
+            >>> encoder = Encoder(component)
+            >>> encoder.touches_by_step[1][0]
+            (1, 0)
+
+        """
+        # Since the n of the touchings and crossings of a step are 1, 2, …,
+        # we can put each of them into its place directly without sorting.
+        counts = [0] * len(self.steps)
+        for touches in self.touches.values():
+            for touch in touches:
+                counts[touch.step] += 1
+
+        by_step = [[None] * count for count in counts]
+        for (halfEdge, touches) in self.touches.items():
+            id = halfEdge.id()
+            for (i, touch) in enumerate(touches):
+                by_step[touch.step][touch.n - 1] = (id, i)
+
+        return by_step
+
     def pullback(self, connection):
         r"""
         Return the list of saddle connections that make up this saddle
@@ -202,19 +388,11 @@ class Encoder:
             [[((3/2 ~ 1.5000000), (1/2*c ~ 0.86602540)) from 1 to 6], [((-3/2 ~ -1.5000000), (1/2*c ~ 0.86602540)) from -9 to 4], [((-3/2 ~ -1.5000000), (-1/2*c ~ -0.86602540)) from 6 to 1], [((3/2 ~ 1.5000000), (-1/2*c ~ -0.86602540)) from 4 to -9]]
 
         """
-        from pyflatsurf import flatsurf
         if self.deformation is None:
             return [connection]
-        assert(connection.surface() == self.deformation.domain())
-        connections = self.deformation(flatsurf.Path[type(connection.surface())](connection))
-        connections = list(connections.value())
-
-        vector = sum([c.vector() for c in connections], type(connections[0].vector())())
-        assert(vector == connection.vector())
-        return connections
+        return self._pullback(connection)
 
-    @property
-    @cache
+    @cached_property
     def perimeter(self):
         r"""
         The relevant perimeter of this component.
@@ -261,8 +439,7 @@ class Encoder:
         return [connection for connection in self.component.perimeter() if
                 self.component.cylinder() or connection.boundary()]
 
-    @property
-    @cache
+    @cached_property
     def in_component(self):
         r"""
         Return for each half edge whether its beginning is part this component
@@ -302,132 +479,327 @@ class Encoder:
 
 
         """
+        # We work with half edges by their index (see
+        # encode_flat_triangulation_columnar()) so that following a half edge
+        # around its vertex or to its negative is a cheap list lookup.
+        halfEdges = list(self.surface.halfEdges())
+        byIndex = [None] * len(halfEdges)
+        for halfEdge in halfEdges:
+            byIndex[_index(halfEdge)] = halfEdge
+
+        nextAtVertex = [_index(self.surface.nextAtVertex(halfEdge)) for halfEdge in byIndex]
+        previousAtVertex = [None] * len(byIndex)
+        for (i, next) in enumerate(nextAtVertex):
+            previousAtVertex[next] = i
+
+        touches = [self.touches[halfEdge] for halfEdge in byIndex]
+
+        # Note that the index of the negative of the half edge with index i is i ^ 1.
         start = {}
         end = {}
 
-        for halfEdge in self.surface.halfEdges():
-            if not self.touches[halfEdge]:
-                previous = self.surface.previousAtVertex(halfEdge)
-                if not self.touches[previous]:
+        for halfEdge in halfEdges:
+            i = _index(halfEdge)
+            if not touches[i]:
+                previous = previousAtVertex[i]
+                if not touches[previous]:
                     # This half edge is not directly involved in the perimeter. We can
                     # only figure out in a second pass whether it is entirely inside or
                     # outside the component.
                     continue
 
-                start[-halfEdge] = end[halfEdge] = start[halfEdge] = end[-halfEdge] = self.touches[previous][0].out
+                start[i ^ 1] = end[i] = start[i] = end[i ^ 1] = touches[previous][0].out
             else:
-                crossings = [touch for touch in self.touches[halfEdge] if isinstance(touch, Crossing)]
+                crossings = [touch for touch in touches[i] if isinstance(touch, Crossing)]
                 if crossings:
                     # When we see a crossing going out of this half edge, we know that everything before it is in the component, and conversely.
-                    start[halfEdge] = crossings[0].out
-                    end[halfEdge] = not crossings[-1].out
+                    start[i] = crossings[0].out
+                    end[i] = not crossings[-1].out
                     continue
 
                 # The perimeter does not cross this half edge, it only touches the source vertex of this half edge.
-                for touch in self.touches[halfEdge]:
-                    if touch.vector == self.surface.fromHalfEdge(halfEdge):
+                vector = self.surface.fromHalfEdge(halfEdge)
+                for touch in touches[i]:
+                    # Only touchings at angle zero can have the vector of the
+                    # half edge.
+                    if _close(touch.key, 0) and self.exact(touch) == vector:
                         if touch.out:
                             # The half edge is part of the perimeter.
-                            start[halfEdge] = end[halfEdge] = True
+                            start[i] = end[i] = True
                             break
                         else:
                             # The half edge is not part of the perimeter, only it's opposite is.
-                            start[halfEdge] = end[halfEdge] = False
+                            start[i] = end[i] = False
                             break
                 else:
                     # The half edge is not part of the perimeter, the touching closest to the half edge decides whether it is inside or outside.
-                    start[halfEdge] = end[halfEdge] = not self.touches[halfEdge][-1].out
+                    start[i] = end[i] = not touches[i][-1].out
+
+        # Walk around the vertices to fill in the blanks produced by half edges
+        # that do not show up in the perimeter at all.
+        # We use an explicit stack instead of recursion so that large surfaces
+        # do not hit the recursion limit. Each half edge is visited at most
+        # once. A half edge is pushed together with False when it is first
+        # visited and again with True to process the remaining half edge at
+        # its vertex once everything reachable from its negative has been
+        # filled in; this is the order in which a recursive flood would
+        # proceed.
+        visited = [False] * len(byIndex)
+
+        for halfEdge in halfEdges:
+            stack = [(_index(halfEdge), False)]
+            while stack:
+                source, resumed = stack.pop()
+                next = nextAtVertex[source]
+
+                if resumed:
+                    if next not in start:
+                        start[next] = end[next] = start[source]
+                        stack.append((next, False))
+                    continue
+
+                if visited[source] or source not in start:
+                    continue
 
-        # Walk around the vertices to fill in the blanks produced by half edges that do not show up in the perimeter at all.
-        visited = set()
+                visited[source] = True
 
-        def flood(source):
-            if source in visited:
-                return
-            if source not in start:
-                return
+                if next ^ 1 not in end:
+                    end[next ^ 1] = start[next ^ 1] = start[source]
+                    stack.append((source, True))
+                    stack.append((next ^ 1, False))
 
-            visited.add(source)
+        assert len(start) == len(byIndex), start
+        assert len(end) == len(byIndex), end
 
-            next = self.surface.nextAtVertex(source)
+        start = {byIndex[i]: value for (i, value) in start.items()}
+        end = {byIndex[i]: value for (i, value) in end.items()}
 
-            if -next not in end:
-                end[-next] = start[source]
-                start[-next] = start[source]
-                flood(-next)
-                if next not in start:
-                    start[next] = start[source]
-                    end[next] = start[source]
-                    flood(next)
+        return start, end
 
-        for halfEdge in self.surface.halfEdges():
-            flood(halfEdge)
 
-        assert all(halfEdge in start for halfEdge in self.surface.halfEdges()), start
-        assert all(halfEdge in end for halfEdge in self.surface.halfEdges()), end
+class Pullback:
+    r"""
+    Pulls saddle connections back along `deformation` and remembers the
+    result.
+
+    If `check` is set, the pullback is verified with exact arithmetic, i.e.,
+    the pulled back saddle connections must add up to the original
+    connection.
+
+    EXAMPLES::
+
+        >>> from flatsurf import polygons, similarity_surfaces, GL2ROrbitClosure
+        >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+        >>> t = polygons.triangle(1, 1, 1)
+        >>> B = similarity_surfaces.billiard(t)
+        >>> S = B.minimal_cover('translation')
+        >>> deformation = to_pyflatsurf(S).eliminateMarkedPoints()
+        >>> O = GL2ROrbitClosure(deformation.codomain())
+        >>> D = next(O.decompositions(bound=64))
+        >>> connection = D.components()[0].perimeter()[0].saddleConnection()
+
+        >>> pullback = Pullback(deformation.section())
+        >>> pullback(connection)
+        [((3/2 ~ 1.5000000), (1/2*c ~ 0.86602540)) from 1 to 6]
+
+    The pullback of the reverse connection is not computed again::
+
+        >>> pullback(-connection)
+        [((-3/2 ~ -1.5000000), (-1/2*c ~ -0.86602540)) from 6 to 1]
+
+    """
+
+    def __init__(self, deformation, check=True):
+        self.deformation = deformation
+        self.check = check
+        self._pullbacks = {}
+
+    def __call__(self, connection):
+        # Saddle connections are determined by their string representation,
+        # see ipyvue_flatsurf.encoding.cache.cache_key().
+        key = repr(connection)
+        if key not in self._pullbacks:
+            negative = repr(-connection)
+            if negative in self._pullbacks:
+                self._pullbacks[key] = [-c for c in reversed(self._pullbacks[negative])]
+            else:
+                self._pullbacks[key] = self._pullback(connection)
+        return self._pullbacks[key]
+
+    def _pullback(self, connection):
+        from pyflatsurf import flatsurf
+
+        if self.check:
+            assert(connection.surface() == self.deformation.domain())
+
+        connections = self.deformation(flatsurf.Path[type(connection.surface())](connection))
+        connections = list(connections.value())
+
+        if self.check:
+            vector = sum([c.vector() for c in connections], type(connections[0].vector())())
+            assert(vector == connection.vector())
+
+        return connections
+
+
+def _index(halfEdge):
+    r"""
+    Return the 0-based index of `halfEdge`, i.e., ``2(e - 1)`` for the half
+    edge ``e`` and ``2(e - 1) + 1`` for ``-e``.
+
+    EXAMPLES::
+
+        >>> from pyflatsurf import flatsurf
+        >>> _index(flatsurf.HalfEdge(2)), _index(flatsurf.HalfEdge(-2))
+        (2, 3)
+
+    """
+    id = halfEdge.id()
+    return 2 * (id - 1) if id > 0 else 2 * (-id - 1) + 1
+
+
+def _sort(records, exact):
+    r"""
+    Sort the touchings and crossings `records` at a half edge in place.
+
+    Comparing touchings and crossings is done with exact arithmetic which is
+    slow. Therefore, we sort by the floating point keys of the records. Only
+    records whose keys are too close to tell them apart are then compared
+    exactly using the data returned by `exact`, see :meth:`Encoder.exact`.
+
+    EXAMPLES::
+
+        >>> records = [Crossing(n=2, step=1, out=False, key=.5), Touching(n=1, step=0, out=True, key=0.), Touching(n=4, step=2, out=False, key=-.25)]
+        >>> _sort(records, exact=None)
+        >>> records
+        [Touching(n=4, step=2, out=False), Touching(n=1, step=0, out=True), Crossing(n=2, step=1, out=False)]
+
+    Records with the same key are ordered exactly::
+
+        >>> from fractions import Fraction
+        >>> positions = {0: Fraction(1, 2) + Fraction(1, 10**20), 1: Fraction(1, 2)}
+        >>> records = [Crossing(n=2, step=0, out=False, key=.5), Crossing(n=2, step=1, out=False, key=.5)]
+        >>> _sort(records, exact=lambda record: positions[record.step])
+        >>> records
+        [Crossing(n=2, step=1, out=False), Crossing(n=2, step=0, out=False)]
+
+    """
+    from functools import cmp_to_key
+
+    records.sort(key=lambda record: (isinstance(record, Crossing), record.key))
+
+    start = 0
+    while start < len(records):
+        end = start + 1
+        while end < len(records) and type(records[end]) is type(records[end - 1]) and _close(records[end].key, records[end - 1].key):
+            end += 1
+
+        if end - start > 1:
+            tied = [(record, exact(record)) for record in records[start:end]]
+            tied.sort(key=cmp_to_key(_compare))
+            records[start:end] = [record for (record, _) in tied]
+
+        start = end
 
-        return start, end
+
+def _compare(lhs, rhs):
+    r"""
+    Return whether the touching or crossing `lhs` comes before (-1) or after
+    (1) `rhs` along their half edge.
+
+    Both are given as a pair of the record and its exact data, see
+    :meth:`Encoder.exact`.
+    """
+    (lhs, lhs_exact), (rhs, rhs_exact) = lhs, rhs
+
+    if isinstance(lhs, Touching) and isinstance(rhs, Crossing):
+        return -1
+    if isinstance(lhs, Crossing) and isinstance(rhs, Touching):
+        return 1
+
+    if isinstance(lhs, Touching):
+        # A touching comes first if the other one is counterclockwise from
+        # it.
+        if lhs_exact.ccw(rhs_exact) == 1:  # = COUNTERCLOCKWISE
+            return -1
+        if lhs_exact.ccw(rhs_exact) == -1:
+            return 1
+    else:
+        if lhs_exact < rhs_exact:
+            return -1
+        if rhs_exact < lhs_exact:
+            return 1
+
+    if lhs.out and not rhs.out:
+        return -1
+    if not lhs.out and rhs.out:
+        return 1
+    assert False
+
+
+def _close(a, b):
+    r"""
+    Return whether the floating point keys `a` and `b` might be in a
+    different order than the exact values that they approximate.
+    """
+    return abs(a - b) <= 1e-9 * max(1, abs(a), abs(b))
 
 
-@dataclass
 class TouchingOrCrossing:
     r"""
     Base class for touchings and crossings, i.e., representing the moment when
     a flow connection hits the triangulation.
+
+    A long perimeter creates lots of these so they only hold the data needed
+    to order them along a half edge. The exact position can be recovered
+    with :meth:`Encoder.exact`.
     """
-    # The sequential id of this touching or crossing within the "step".
-    n: int
-    # The saddle connection which created this touching or crossing.
-    step: object
-    # Whether this crossing is leaving or entering.
-    # At the initial point of a saddle connection, there is a leaving
-    # touching (out: True), then at every actual crossing, there is a pair
-    # of crossings, one entering (out: False) and one leaving. Finally, at
-    # the target of the saddle connection, there is an entering touching.
-    out: bool
-
-
-@dataclass
+    __slots__ = ("n", "step", "out", "key")
+
+    def __init__(self, n, step, out, key=0.):
+        # The sequential id of this touching or crossing within the "step".
+        self.n = n
+        # The index of the saddle connection which created this touching or
+        # crossing in Encoder.steps.
+        self.step = step
+        # Whether this crossing is leaving or entering.
+        # At the initial point of a saddle connection, there is a leaving
+        # touching (out: True), then at every actual crossing, there is a pair
+        # of crossings, one entering (out: False) and one leaving. Finally, at
+        # the target of the saddle connection, there is an entering touching.
+        self.out = out
+        # An approximation of the position along the half edge, see _sort().
+        self.key = key
+
+    def _fields(self):
+        return {"n": self.n, "step": self.step, "out": self.out}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{key}={value!r}' for (key, value) in self._fields().items())})"
+
+
 class Touching(TouchingOrCrossing):
     r"""
     A touching of a flow connection and the triangulation, i.e., the moment
     when flaw connection starts/ends at a vertex.
+
+    EXAMPLES::
+
+        >>> Touching(n=1, step=0, out=True)
+        Touching(n=1, step=0, out=True)
+
     """
-    # The direction of the saddle connection that created this tuoching.
-    vector: object
-
-    def __lt__(self, rhs):
-        if isinstance(rhs, Crossing):
-            return True
-        if self.vector.ccw(rhs.vector) == 1:  # = CW
-            return True
-        if self.vector.ccw(rhs.vector) == -1:
-            return False
-        if self.out and not rhs.out:
-            return True
-        if not self.out and rhs.out:
-            return False
-        assert False
-
-
-@dataclass
+    __slots__ = ()
+
+
 class Crossing(TouchingOrCrossing):
     r"""
     A crossing of a flow connection and the triangulation, i.e., the moment
     when flaw connection crosses over a half edge.
     """
-    # The location of the intersection.
-    intersection: object
-
-    def __lt__(self, rhs):
-        if isinstance(rhs, Touching):
-            return False
-        if self.intersection < rhs.intersection:
-            return True
-        if rhs.intersection < self.intersection:
-            return False
-        if self.out and not rhs.out:
-            return True
-        if not self.out and rhs.out:
-            return False
-        assert False
+    __slots__ = ()
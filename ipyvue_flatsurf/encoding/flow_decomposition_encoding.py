@@ -23,10 +23,15 @@ Encodes a flatsurf FlowDecomposition in a format that is understood by vue-flats
 from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
 
 
-def encode_flow_decomposition(decomposition, deformation=None):
+def encode_flow_decomposition(decomposition, deformation=None, processes=1):
     r"""
     Return the flow decomposition encoded as a primitive type.
 
+    If `processes` is more than one, the components are encoded on that many
+    processes, see :mod:`ipyvue_flatsurf.encoding.parallel`. Components that
+    are pulled back along a `deformation` are always encoded in this process
+    since a deformation cannot be sent to another process.
+
     EXAMPLES::
 
         >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
@@ -36,5 +41,14 @@ def encode_flow_decomposition(decomposition, deformation=None):
         >>> encode_flow_decomposition(D)
         [{'cylinder': True, 'perimeter': [...], 'inside': [1, -1, 2, -2, 3, -3]}]
 
+    ::
+
+        >>> encode_flow_decomposition(D, processes=2) == encode_flow_decomposition(D)
+        True
+
     """
+    if processes != 1 and deformation is None:
+        from ipyvue_flatsurf.encoding.parallel import encode_flow_components
+        return encode_flow_components(decomposition.components(), processes=processes)
+
     return [encode_flow_component(component, deformation) for component in decomposition.components()]
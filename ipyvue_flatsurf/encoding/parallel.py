@@ -0,0 +1,217 @@
+r"""
+Encodes flow components on a pool of processes.
+
+Parallel encoding is opt-in. By default, flow components are encoded one
+after another in the calling process.
+
+The components are cppyy wrappers of C++ objects that cannot be sent to
+another process. Instead, we send the triangulation and the vertical
+direction of their flow decomposition which can be pickled. Each worker
+rebuilds the decomposition from these and encodes the components that have
+the same representation as the ones requested. Components that are not
+found in the rebuilt decomposition, e.g., because the original decomposition
+has not been decomposed completely, are encoded in the calling process
+later. The result is therefore the same as when encoding sequentially.
+
+Like :mod:`ipyvue_flatsurf.precompute`, the workers are started with
+``spawn`` since cppyy does not survive forking, so starting a pool takes a
+few seconds. The pools are kept around for later calls.
+
+EXAMPLES::
+
+    >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+    >>> S = translation_surfaces.mcmullen_L(1, 1, 1, 1)
+    >>> D = next(GL2ROrbitClosure(S).decompositions(bound=64))
+
+    >>> from ipyvue_flatsurf.encoding.cache import cache_clear, cache_info
+    >>> cache_clear()
+    >>> encoded = encode_flow_components(D.components(), processes=2)
+
+The components have all been encoded by the workers::
+
+    >>> cache_info().misses
+    0
+
+The encodings are identical to the ones computed in this process::
+
+    >>> from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+    >>> encoded == [encode_flow_component(component) for component in D.components()]
+    True
+    >>> encode_flow_components(D.components(), compress=True, processes=2) == [encode_flow_component(component, compress=True) for component in D.components()]
+    True
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+import threading
+
+# The process pools by number of processes.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def encode_flow_components(components, compress=False, processes=1):
+    r"""
+    Return ``[encode_flow_component(component, None, compress) for component in components]``
+    encoded on `processes` processes.
+
+    The encodings are taken from and put into the encoding cache of
+    :mod:`ipyvue_flatsurf.encoding.cache`.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+        >>> S = translation_surfaces.square_torus()
+        >>> D = next(GL2ROrbitClosure(S).decompositions(bound=64))
+        >>> encode_flow_components(D.components())
+        [{'cylinder': True, 'perimeter': [...], 'inside': [1, -1, 2, -2, 3, -3]}]
+
+    """
+    from ipyvue_flatsurf.encoding.cache import cached
+    from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+
+    components = list(components)
+
+    for (_, future) in prefetch_flow_components(components, compress=compress, processes=processes):
+        future.result()
+
+    return [cached(encode_flow_component, component, None, compress) for component in components]
+
+
+def prefetch_flow_components(components, compress=False, processes=1):
+    r"""
+    Start encoding `components` on `processes` processes and return pairs of
+    a list of components and a future.
+
+    Once a future is done, the encodings of its components are in the
+    encoding cache unless the workers could not find them, see the module
+    documentation. Components that are already cached are not encoded
+    again. If `processes` is ``1``, nothing is encoded and no pairs are
+    returned.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+        >>> S = translation_surfaces.square_torus()
+        >>> D = next(GL2ROrbitClosure(S).decompositions(bound=64))
+        >>> prefetch_flow_components(D.components())
+        []
+
+    """
+    processes = int(processes)
+    if processes < 1:
+        raise ValueError(f"number of processes must be positive but got {processes}")
+    if processes == 1:
+        return []
+
+    from ipyvue_flatsurf.encoding.cache import cache, content_hash, encoding_key
+    from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+
+    decompositions = {}
+    for component in components:
+        key, refs = encoding_key(encode_flow_component, component, None, compress)
+        if key in cache:
+            continue
+
+        decomposition = component.decomposition()
+        vertical = decomposition.vertical().vertical()
+        surface = decomposition.surface()
+        decompositions.setdefault((content_hash(surface), repr(vertical)), (surface, vertical, []))[2].append((component, key, refs))
+
+    pool = _pool(processes)
+
+    prefetched = []
+    for (surface, vertical, pending) in decompositions.values():
+        size = -(-len(pending) // processes)
+        for start in range(0, len(pending), size):
+            chunk = pending[start:start + size]
+            future = pool.submit(_encode_flow_components, surface, vertical, [repr(component) for (component, _, _) in chunk], compress)
+            prefetched.append(([component for (component, _, _) in chunk], _cache_when_done(future, chunk)))
+
+    return prefetched
+
+
+def _cache_when_done(future, chunk):
+    r"""
+    Return a future that completes once the encodings computed by `future`
+    for the `chunk` of components have been put into the encoding cache.
+    """
+    from concurrent.futures import Future
+    from ipyvue_flatsurf.encoding.cache import cache
+
+    cached = Future()
+
+    def done(future):
+        if future.exception() is not None:
+            cached.set_exception(future.exception())
+            return
+
+        for ((_, key, refs), encoded) in zip(chunk, future.result()):
+            if encoded is not None:
+                cache.put(key, encoded, refs=refs)
+        cached.set_result(None)
+
+    future.add_done_callback(done)
+    return cached
+
+
+def _pool(processes):
+    r"""
+    Return a pool of `processes` processes that is reused by later calls.
+    """
+    with _pools_lock:
+        if processes not in _pools:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            _pools[processes] = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        return _pools[processes]
+
+
+def _encode_flow_components(surface, vertical, components, compress):
+    r"""
+    Return the encodings of the flow components of the decomposition of
+    `surface` in the `vertical` direction whose representations are
+    `components`; ``None`` for components that are not in that
+    decomposition.
+
+    This runs in a worker process.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+        >>> S = translation_surfaces.square_torus()
+        >>> D = next(GL2ROrbitClosure(S).decompositions(bound=64))
+        >>> _encode_flow_components(D.surface(), D.vertical().vertical(), [repr(D.components()[0]), "unknown"], False)
+        [{'cylinder': True, 'perimeter': [...], 'inside': [1, -1, 2, -2, 3, -3]}, None]
+
+    """
+    from pyflatsurf import flatsurf
+    from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+
+    decomposition = flatsurf.makeFlowDecomposition(surface, vertical)
+    decomposition.decompose(-1)
+
+    encoded = {}
+    wanted = set(components)
+    for component in decomposition.components():
+        if repr(component) in wanted:
+            encoded[repr(component)] = encode_flow_component(component, None, compress)
+
+    return [encoded.get(component) for component in components]
@@ -23,10 +23,13 @@ Encodes a flatsurf Path in a format that is understood by vue-flatsurf.
 from ipyvue_flatsurf.encoding.saddle_connection_encoding import encode_saddle_connection
 
 
-def encode_path(path):
+def encode_path(path, compress=False):
     r"""
     Return the path encoded as a primitive type.
 
+    If `compress` is set, the crossings of the saddle connections are
+    compressed, see :func:`encode_saddle_connection`.
+
     EXAMPLES::
 
         >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
@@ -43,6 +46,8 @@ def encode_path(path):
         {'connections': ...}
 
     """
-    return {
-        'connections': [encode_saddle_connection(connection) for connection in path]
-    }
+    from ipyvue_flatsurf.encoding.cache import cached, memoized_content_hashes
+    with memoized_content_hashes():
+        return {
+            'connections': [cached(encode_saddle_connection, connection, compress) for connection in path]
+        }
@@ -1,5 +1,9 @@
 r"""
 Encodes a flatsurf SaddleConnection in a format that is understood by vue-flatsurf.
+
+Long saddle connections cross the edges of the triangulation many times and
+usually in a periodic pattern. Such crossings can be encoded as runs, see
+:func:`compress_crossings`.
 """
 # ********************************************************************
 #  This file is part of ipyvue-flatsurf.
@@ -21,10 +25,16 @@ Encodes a flatsurf SaddleConnection in a format that is understood by vue-flatsu
 # ********************************************************************
 
 
-def encode_saddle_connection(connection):
+def encode_saddle_connection(connection, compress=False):
     r"""
     Return the saddle connection as a primitive type.
 
+    If `compress` is set, the crossings of the connection are encoded as
+    ``crossingRuns``, see :func:`compress_crossings`. The frontend expands
+    them again before handing them to vue-flatsurf. Since the runs hold NumPy
+    arrays, this only works with the binary codec, see
+    :mod:`ipyvue_flatsurf.codec`.
+
     EXAMPLES::
 
         >>> from flatsurf import translation_surfaces
@@ -35,17 +45,205 @@ def encode_saddle_connection(connection):
         >>> connection = next(iter(T.connections()))
         >>> encode_saddle_connection(connection)
         {'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []}
+        >>> encode_saddle_connection(connection, compress=True)
+        {'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossingRuns': []}
 
     """
-    return {
+    encoded = {
         "source": connection.source().id(),
         "target": connection.target().id(),
         "vector": {
             "x": float(connection.vector().x()),
             "y": float(connection.vector().y()),
         },
-        "crossings": [{
+    }
+
+    if compress:
+        encoded["crossingRuns"] = encode_crossings(connection.path())
+    else:
+        encoded["crossings"] = [{
            "halfEdge": intersection.halfEdge().id(),
            "at": intersection.at(),
         } for intersection in connection.path()]
-    }
+
+    return encoded
+
+
+def encode_crossings(intersections):
+    r"""
+    Return the crossings of a saddle connection with the edges of the
+    triangulation, given by the iterable of `intersections`, compressed as
+    with :func:`compress_crossings`.
+
+    The intersections are consumed one by one and only their half edge and
+    position are kept in flat arrays.
+    """
+    from array import array
+    import numpy
+
+    halfEdges = array("i")
+    at = array("d")
+    for intersection in intersections:
+        halfEdges.append(intersection.halfEdge().id())
+        at.append(float(intersection.at()))
+
+    return compress_crossings(numpy.frombuffer(halfEdges, dtype=numpy.int32), numpy.frombuffer(at, dtype=numpy.float64))
+
+
+def compress_crossings(halfEdges, at, candidates=4, tolerance=1e-9):
+    r"""
+    Return the crossings of a saddle connection with the half edges
+    `halfEdges` at the positions `at` as a list of runs.
+
+    A run is a block of crossings that repeats ``count`` times. Each time it
+    repeats, the position of each of its crossings changes by ``step``.
+    Crossings that do not repeat are collected in runs with ``count`` 1 and
+    no ``step``.
+
+    Repetitions are detected greedily: at each crossing, the next
+    `candidates` crossings of the same half edge determine the periods that
+    are tried. Positions must match their arithmetic progression up to a
+    relative `tolerance`.
+
+    EXAMPLES:
+
+    A connection that crosses the half edges 1 and 3 alternatingly, moving
+    along them by a constant amount each time::
+
+        >>> import numpy
+        >>> halfEdges = numpy.array([2, 1, 3, 1, 3, 1, 3, 1, 3], dtype=numpy.int32)
+        >>> at = numpy.array([.5, .1, .2, .2, .3, .3, .4, .4, .5])
+        >>> runs = compress_crossings(halfEdges, at)
+        >>> for run in runs:
+        ...     print(run)
+        {'halfEdges': array([2], dtype=int32), 'at': array([0.5]), 'count': 1}
+        {'halfEdges': array([1, 3], dtype=int32), 'at': array([0.1, 0.2]), 'step': array([0.1, 0.1]), 'count': 4}
+
+    The runs expand to the original crossings::
+
+        >>> expand_crossings(runs)
+        [{'halfEdge': 2, 'at': 0.5}, {'halfEdge': 1, 'at': 0.1}, {'halfEdge': 3, 'at': 0.2}, {'halfEdge': 1, 'at': 0.2}, ...]
+        >>> numpy.allclose([crossing["at"] for crossing in expand_crossings(runs)], at)
+        True
+
+    """
+    import numpy
+
+    halfEdges = numpy.asarray(halfEdges, dtype=numpy.int32)
+    at = numpy.asarray(at, dtype=numpy.float64)
+    n = len(halfEdges)
+
+    # The next crossing of the same half edge (or n if there is none.)
+    order = numpy.lexsort((numpy.arange(n), halfEdges))
+    following = numpy.full(n, n)
+    same = halfEdges[order[:-1]] == halfEdges[order[1:]]
+    following[order[:-1][same]] = order[1:][same]
+
+    # Python lists are much faster than NumPy arrays for scalar access.
+    edges = halfEdges.tolist()
+    positions = at.tolist()
+    following = following.tolist()
+
+    runs = []
+    literal = None
+
+    def flush(end):
+        if literal is not None:
+            runs.append({"halfEdges": halfEdges[literal:end], "at": at[literal:end], "count": 1})
+
+    i = 0
+    while i < n:
+        best = None
+
+        candidate = following[i]
+        for _ in range(candidates):
+            period = candidate - i
+            if i + 3 * period > n:
+                # Too short to repeat three times.
+                break
+            if edges[i + 2 * period] == edges[i] and abs(positions[i + 2 * period] - 2 * positions[i + period] + positions[i]) <= tolerance * max(1, abs(positions[i + 2 * period])):
+                # Only compare the entire blocks when their first crossings
+                # could be the start of a run.
+                count = _repetitions(halfEdges, at, i, period, tolerance)
+            else:
+                count = 1
+            if count >= 3 and (best is None or count * period > best[0] * best[1]):
+                best = (count, period)
+            candidate = following[candidate]
+
+        if best is None:
+            if literal is None:
+                literal = i
+            i += 1
+            continue
+
+        flush(i)
+        literal = None
+
+        count, period = best
+        runs.append({
+            "halfEdges": halfEdges[i:i + period],
+            "at": at[i:i + period],
+            "step": at[i + period:i + 2 * period] - at[i:i + period],
+            "count": count,
+        })
+        i += count * period
+
+    flush(n)
+
+    return runs
+
+
+def _repetitions(halfEdges, at, start, period, tolerance):
+    r"""
+    Return how often the block of `period` crossings at `start` repeats with
+    positions in arithmetic progression.
+    """
+    import numpy
+
+    n = len(halfEdges)
+    block = halfEdges[start:start + period]
+    first = at[start:start + period]
+    step = at[start + period:start + 2 * period] - first
+
+    count = 1
+    # Compare a growing number of repetitions at once so that long runs
+    # only need a few comparisons.
+    chunk = 1
+    while start + (count + 1) * period <= n:
+        chunk = min(chunk, (n - start) // period - count)
+        repetitions = numpy.arange(count, count + chunk)[:, None]
+        blocks = halfEdges[start + count * period:start + (count + chunk) * period].reshape(chunk, period)
+        positions = at[start + count * period:start + (count + chunk) * period].reshape(chunk, period)
+        expected = first + repetitions * step
+        matches = numpy.all(blocks == block, axis=1) & numpy.all(numpy.abs(positions - expected) <= tolerance * numpy.maximum(1, numpy.abs(expected)), axis=1)
+        if not matches.all():
+            return count + int(numpy.argmin(matches))
+        count += chunk
+        chunk *= 2
+
+    return count
+
+
+def expand_crossings(runs):
+    r"""
+    Return the crossings compressed with :func:`compress_crossings` in the
+    uncompressed format, i.e., as they would have been encoded by
+    :func:`encode_saddle_connection` without compression.
+
+    EXAMPLES::
+
+        >>> expand_crossings([{"halfEdges": [1, -2], "at": [0.25, 0.5], "step": [0.125, 0], "count": 2}])
+        [{'halfEdge': 1, 'at': 0.25}, {'halfEdge': -2, 'at': 0.5}, {'halfEdge': 1, 'at': 0.375}, {'halfEdge': -2, 'at': 0.5}]
+
+    """
+    crossings = []
+    for run in runs:
+        step = run.get("step")
+        for repetition in range(run["count"]):
+            for (j, halfEdge) in enumerate(run["halfEdges"]):
+                crossings.append({
+                    "halfEdge": int(halfEdge),
+                    "at": float(run["at"][j] + (repetition * step[j] if step is not None else 0)),
+                })
+    return crossings
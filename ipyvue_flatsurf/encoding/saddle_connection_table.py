@@ -0,0 +1,279 @@
+r"""
+A table of encoded saddle connections that is shared by all the flow
+components, paths, and saddle connections shown in a widget.
+
+The boundary between two flow components is part of the perimeter of both
+components, and saddle connections that are shown explicitly are often on
+the perimeter of a component as well. Instead of sending such a connection
+with all its crossings repeatedly, widgets send it once as part of this
+table and refer to it by its position in the table. A connection and its
+negative, e.g., the two sides of the boundary between two components, are
+stored only once; a reference to the negative is marked as ``$reversed``.
+
+EXAMPLES::
+
+    >>> connection = {'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []}
+    >>> component = {'cylinder': True, 'perimeter': [dict(vertical=False, boundary=True, touches=[], **connection)], 'inside': []}
+
+    >>> table = SaddleConnectionTable()
+    >>> table.refer(component)
+    {'cylinder': True, 'perimeter': [{'vertical': False, 'boundary': True, 'touches': [], '$connection': 0}], 'inside': []}
+    >>> table.refer({'connections': [connection]})
+    {'connections': [{'$connection': 0}]}
+    >>> table.connections
+    [{'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []}]
+
+    >>> negative = {'source': -1, 'target': 1, 'vector': {'x': -1.0, 'y': -0.0}, 'crossings': []}
+    >>> table.refer({'connections': [negative]})
+    {'connections': [{'$connection': 0, '$reversed': True}]}
+
+When the triangulation changes, connections of the new triangulation should
+not be found in the table by the connections of the old triangulation. This
+is done by passing a new revision::
+
+    >>> flipped = {'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []}
+    >>> table.refer({'connections': [flipped]}, revision=1)
+    {'connections': [{'$connection': 1}]}
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+
+# The keys of an encoded saddle connection, see
+# ipyvue_flatsurf.encoding.saddle_connection_encoding.encode_saddle_connection().
+FIELDS = ("source", "target", "vector", "crossings", "crossingRuns")
+
+
+class SaddleConnectionTable:
+    r"""
+    A table of distinct encoded saddle connections.
+
+    An encoded connection is found in the table by the identity of its
+    crossings which are shared by all copies of a cached encoding, see
+    :mod:`ipyvue_flatsurf.encoding.cache`. Otherwise, a connection is found
+    by the half edge it starts at and its vector, which determine a saddle
+    connection. To not confuse connections of different triangulations, the
+    number of crossings and the first and last half edge crossed must match
+    as well, and the connections must have been added for the same
+    `revision` of the triangulation.
+
+    EXAMPLES::
+
+        >>> table = SaddleConnectionTable()
+        >>> table.index({'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []})
+        (0, False)
+        >>> table.index({'source': -1, 'target': 1, 'vector': {'x': -1.0, 'y': -0.0}, 'crossings': []})
+        (0, True)
+        >>> table.index({'source': 2, 'target': -2, 'vector': {'x': 0.0, 'y': 1.0}, 'crossings': []})
+        (1, False)
+
+    The connections that have been added since the last call to
+    :meth:`pending` are what needs to be sent to the frontend::
+
+        >>> len(table.pending())
+        2
+        >>> table.pending()
+        []
+
+    """
+
+    def __init__(self):
+        self.connections = []
+        self._by_crossings = {}
+        self._by_vector = {}
+        self._crossings = []
+        self._references = []
+        self._sent = 0
+
+        # The number of connections that are referenced, see refer() and
+        # release().
+        self.used = 0
+
+    def index(self, connection, revision=0):
+        r"""
+        Return the position of the encoded `connection` in this table and
+        whether it is stored as its negative; add it to the table if neither
+        is in the table yet.
+
+        Connections are only found by their vector if they were added for
+        the same `revision` of the triangulation.
+
+        EXAMPLES::
+
+            >>> table = SaddleConnectionTable()
+            >>> table.index({'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []})
+            (0, False)
+            >>> table.index({'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []}, revision=1)
+            (1, False)
+
+        """
+        crossings = _crossings(connection)
+
+        found = self._by_crossings.get(id(crossings))
+        if found is not None:
+            return found
+
+        vector = connection["vector"]
+        signature = _signature(crossings)
+
+        same = self._by_vector.get((revision, connection["source"], vector["x"], vector["y"]))
+        negative = self._by_vector.get((revision, connection["target"], -vector["x"], -vector["y"]))
+        if same is not None and same[1] == signature:
+            found = (same[0], False)
+        elif negative is not None and negative[1] == _reversed(signature):
+            found = (negative[0], True)
+        else:
+            found = (len(self.connections), False)
+            self._by_vector[(revision, connection["source"], vector["x"], vector["y"])] = (found[0], signature)
+            self.connections.append(connection)
+            self._references.append(0)
+
+        # Keep the crossings alive so that their identity is not reused.
+        self._crossings.append(crossings)
+        self._by_crossings[id(crossings)] = found
+
+        return found
+
+    def refer(self, encoded, references=None, revision=0):
+        r"""
+        Return a copy of `encoded` where every encoded saddle connection is
+        replaced by a reference ``{"$connection": index}`` into this table.
+
+        Any other keys of a dict that encodes a saddle connection, such as
+        the ``touches`` of a perimeter connection of a flow component, are
+        kept next to the reference.
+
+        The positions of the connections referred to are appended to
+        `references`; they should be passed to :meth:`release` once the copy
+        is not used anymore.
+
+        The connections are looked up for the `revision` of the triangulation
+        they belong to, see :meth:`index`.
+        """
+        if isinstance(encoded, dict):
+            if "source" in encoded and "vector" in encoded:
+                connection = {key: value for (key, value) in encoded.items() if key in FIELDS}
+                referred = {key: value for (key, value) in encoded.items() if key not in FIELDS}
+
+                index, reversed = self.index(connection, revision)
+                referred["$connection"] = index
+                if reversed:
+                    referred["$reversed"] = True
+
+                if self._references[index] == 0:
+                    self.used += 1
+                self._references[index] += 1
+                if references is not None:
+                    references.append(index)
+
+                return referred
+            return {key: self.refer(value, references, revision) for (key, value) in encoded.items()}
+        if isinstance(encoded, list):
+            return [self.refer(item, references, revision) for item in encoded]
+        return encoded
+
+    def release(self, references):
+        r"""
+        Forget about the `references` to connections in this table, see
+        :meth:`refer`.
+
+        EXAMPLES::
+
+            >>> table = SaddleConnectionTable()
+            >>> references = []
+            >>> table.refer([{'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}, 'crossings': []}], references)
+            [{'$connection': 0}]
+            >>> table.used
+            1
+            >>> table.release(references)
+            >>> table.used
+            0
+
+        """
+        for index in references:
+            self._references[index] -= 1
+            if self._references[index] == 0:
+                self.used -= 1
+
+    def pending(self):
+        r"""
+        Return the connections that were added to this table since this
+        method was last called.
+        """
+        pending = self.connections[self._sent:]
+        self._sent = len(self.connections)
+        return pending
+
+    def __len__(self):
+        return len(self.connections)
+
+
+def _crossings(connection):
+    r"""
+    Return the (possibly compressed) crossings of the encoded `connection`.
+    """
+    return connection["crossingRuns"] if "crossingRuns" in connection else connection["crossings"]
+
+
+def _signature(crossings):
+    r"""
+    Return the number of `crossings` and the first and last half edge
+    crossed.
+
+    EXAMPLES::
+
+        >>> _signature([{'halfEdge': 2, 'at': 0.5}, {'halfEdge': -3, 'at': 0.25}])
+        (2, 2, -3)
+        >>> _signature([{'halfEdges': [2, -3], 'at': [0.5, 0.25], 'count': 3}])
+        (6, 2, -3)
+        >>> _signature([])
+        (0, None, None)
+
+    """
+    if not crossings:
+        return (0, None, None)
+
+    if "halfEdges" in crossings[0]:
+        count = sum(run["count"] * len(run["halfEdges"]) for run in crossings)
+        return (count, int(crossings[0]["halfEdges"][0]), int(crossings[-1]["halfEdges"][-1]))
+
+    return (len(crossings), crossings[0]["halfEdge"], crossings[-1]["halfEdge"])
+
+
+def _reversed(signature):
+    r"""
+    Return the :func:`_signature` of the negative of a saddle connection
+    with `signature`.
+
+    The negative crosses the same edges in reverse order from the other
+    side.
+
+    EXAMPLES::
+
+        >>> _reversed((2, 2, -3))
+        (2, 3, -2)
+        >>> _reversed((0, None, None))
+        (0, None, None)
+
+    """
+    count, first, last = signature
+    if count == 0:
+        return signature
+    return (count, -last, -first)
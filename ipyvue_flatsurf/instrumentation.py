@@ -0,0 +1,273 @@
+r"""
+Opt-in instrumentation of widgets.
+
+An instrumented widget records how much time it spends in the different
+stages of turning flatsurf objects into something that can be displayed,
+e.g., converting to pyflatsurf, encoding flow components, serializing, and
+syncing with the frontend, and how many bytes it sends for each synced
+trait.
+
+EXAMPLES::
+
+    >>> from flatsurf import translation_surfaces
+    >>> S = translation_surfaces.square_torus()
+
+    >>> from ipyvue_flatsurf import Widget
+    >>> W = Widget(S, instrument=True)
+    >>> stats = W.stats()
+    >>> stats["stages"]["to_pyflatsurf"]
+    {'calls': 1, 'seconds': ...}
+    >>> stats["messages"]["triangulation_prop"]
+    {'messages': 1, 'bytes': ...}
+
+Instrumentation can be enabled for all widgets that do not explicitly
+disable it::
+
+    >>> set_default_instrumentation(True)
+    >>> Widget(S).stats()
+    {'stages': {...}, 'messages': {...}}
+    >>> set_default_instrumentation(False)
+
+Everything that is recorded is also logged to the
+``ipyvue_flatsurf.instrumentation`` logger at the ``DEBUG`` level and
+passed on to the hooks registered with :func:`add_hook`::
+
+    >>> events = []
+    >>> hook = lambda kind, name, value: events.append((kind, name))
+    >>> add_hook(hook)
+    >>> W = Widget(S, instrument=True)
+    >>> ('stage', 'to_pyflatsurf') in events
+    True
+    >>> remove_hook(hook)
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_default = False
+
+_hooks = []
+
+# The statistics of the widget on whose behalf we are currently working.
+# This is None unless the widget is instrumented so that the stages in the
+# encoding modules cost next to nothing otherwise.
+_current = ContextVar("ipyvue_flatsurf_stats", default=None)
+
+
+class Stats:
+    r"""
+    The statistics recorded for an instrumented widget.
+
+    Stages are timed inclusively, e.g., the time spent in
+    ``Encoder.touches`` is also part of the time spent in
+    ``encode_flow_component``.
+
+    EXAMPLES::
+
+        >>> stats = Stats()
+        >>> stats.record_stage("encode", 0.5)
+        >>> stats.record_stage("encode", 0.25)
+        >>> stats.record_message("triangulation_prop", 1337)
+        >>> stats.as_dict()
+        {'stages': {'encode': {'calls': 2, 'seconds': 0.75}}, 'messages': {'triangulation_prop': {'messages': 1, 'bytes': 1337}}}
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._messages = {}
+
+    @classmethod
+    def create(cls, instrument=None):
+        r"""
+        Return the statistics to record for a widget created with `instrument`.
+
+        If `instrument` is ``None``, use the default set with
+        :func:`set_default_instrumentation`.
+
+        EXAMPLES::
+
+            >>> Stats.create(True)
+            Stats(stages=0, messages=0)
+            >>> Stats.create() is None
+            True
+
+        """
+        if isinstance(instrument, Stats):
+            return instrument
+        if instrument is None:
+            instrument = _default
+        return cls() if instrument else None
+
+    def record_stage(self, name, seconds):
+        r"""
+        Record that the stage `name` took `seconds`.
+        """
+        with self._lock:
+            stage = self._stages.setdefault(name, [0, 0.])
+            stage[0] += 1
+            stage[1] += seconds
+
+        _notify("stage", name, seconds)
+
+    def record_message(self, trait, bytes):
+        r"""
+        Record that `bytes` have been sent to sync the `trait`.
+        """
+        with self._lock:
+            message = self._messages.setdefault(trait, [0, 0])
+            message[0] += 1
+            message[1] += bytes
+
+        _notify("message", trait, bytes)
+
+    def as_dict(self):
+        r"""
+        Return a snapshot of these statistics as a dict.
+        """
+        with self._lock:
+            return {
+                "stages": {name: {"calls": calls, "seconds": seconds} for (name, (calls, seconds)) in self._stages.items()},
+                "messages": {trait: {"messages": messages, "bytes": bytes} for (trait, (messages, bytes)) in self._messages.items()},
+            }
+
+    def clear(self):
+        r"""
+        Forget everything recorded so far.
+
+        EXAMPLES::
+
+            >>> stats = Stats()
+            >>> stats.record_stage("encode", 0.5)
+            >>> stats.clear()
+            >>> stats.as_dict()
+            {'stages': {}, 'messages': {}}
+
+        """
+        with self._lock:
+            self._stages.clear()
+            self._messages.clear()
+
+    def __repr__(self):
+        return f"Stats(stages={len(self._stages)}, messages={len(self._messages)})"
+
+
+def _notify(kind, name, value):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s %s: %s", kind, name, value)
+
+    for hook in list(_hooks):
+        hook(kind, name, value)
+
+
+@contextmanager
+def collecting(stats):
+    r"""
+    Record all stages in this context to `stats`.
+
+    Does nothing if `stats` is ``None``.
+
+    EXAMPLES::
+
+        >>> stats = Stats()
+        >>> with collecting(stats):
+        ...     with stage("encode"):
+        ...         pass
+        >>> stats.as_dict()["stages"]["encode"]["calls"]
+        1
+
+    """
+    if stats is None:
+        yield
+        return
+
+    token = _current.set(stats)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name):
+    r"""
+    Time the code in this context as the stage `name` if we are
+    :func:`collecting` statistics.
+
+    EXAMPLES::
+
+        >>> with stage("encode"):
+        ...     pass
+
+    """
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.record_stage(name, time.perf_counter() - start)
+
+
+def set_default_instrumentation(enabled):
+    r"""
+    Set whether widgets that are created without an explicit `instrument`
+    argument are instrumented.
+
+    EXAMPLES::
+
+        >>> set_default_instrumentation(True)
+        >>> Stats.create()
+        Stats(stages=0, messages=0)
+        >>> set_default_instrumentation(False)
+
+    """
+    global _default
+    _default = bool(enabled)
+
+
+def add_hook(hook):
+    r"""
+    Call ``hook(kind, name, value)`` whenever an instrumented widget records
+    something.
+
+    Here, `kind` is either ``"stage"`` and `value` the time in seconds spent
+    in the stage `name`, or `kind` is ``"message"`` and `value` the number of
+    bytes sent to sync the trait `name`.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    r"""
+    Stop calling a `hook` that was registered with :func:`add_hook`.
+    """
+    _hooks.remove(hook)
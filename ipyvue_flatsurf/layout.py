@@ -0,0 +1,434 @@
+r"""
+Lays out the triangles of a flat triangulation in the plane.
+
+The layout is computed from the encoded triangulation, see
+:mod:`ipyvue_flatsurf.encoding.flat_triangulation_encoding`. Starting from
+the face of the half edge with index 0, faces are unfolded along a
+breadth-first search through the triangulation. Each step of the search
+places all the faces at the same distance from the first face at once.
+
+A face is not unfolded across an edge if it would overlap a face that has
+already been placed. Such edges are not glued in the layout. If a face
+cannot be unfolded across any edge, it starts a new component of the layout
+next to the faces placed so far.
+
+This layout is used by exports that work without a frontend, such as
+:func:`ipyvue_flatsurf.svg.render_svg`, and for overviews, see
+:mod:`ipyvue_flatsurf.encoding.detail`. vue-flatsurf computes its own layout
+in the frontend which users can change by gluing edges, so the paths drawn
+there are still reconstructed with the layout that the frontend reports.
+
+EXAMPLES::
+
+    >>> import numpy
+    >>> torus = {
+    ...     "vertexPermutation": numpy.array([5, 4, 1, 0, 3, 2], dtype=numpy.int32),
+    ...     "vectors": numpy.array([[1., 0.], [0., 1.], [-1., -1.]]),
+    ... }
+    >>> L = layout(torus)
+
+The start points of the half edges ``1, -1, 2, -2, 3, -3`` in the plane::
+
+    >>> L.start
+    array([[ 0.,  0.],
+           [ 1.,  0.],
+           [ 1.,  0.],
+           [ 0.,  0.],
+           [ 1.,  1.],
+           [ 0., -1.]])
+
+The second triangle was unfolded across the edge ``1`` so only that edge is
+glued in the picture::
+
+    >>> L.inner
+    array([ True,  True, False, False, False, False])
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+import math
+
+import numpy
+
+
+def index(halfEdge):
+    r"""
+    Return the index of the half edge with id `halfEdge`, see
+    :func:`encode_flat_triangulation_columnar`.
+
+    Works for NumPy arrays of ids as well.
+
+    EXAMPLES::
+
+        >>> int(index(-2))
+        3
+        >>> index(numpy.array([1, -1, 2]))
+        array([0, 1, 2])
+
+    """
+    halfEdge = numpy.asarray(halfEdge)
+    return 2 * (numpy.abs(halfEdge) - 1) + (halfEdge < 0)
+
+
+def half_edge(index):
+    r"""
+    Return the id of the half edge with index `index`, i.e., the inverse of
+    :func:`index`.
+
+    EXAMPLES::
+
+        >>> half_edge(numpy.array([0, 1, 2, 3]))
+        array([ 1, -1,  2, -2])
+
+    """
+    index = numpy.asarray(index)
+    return numpy.where(index % 2, -(index // 2 + 1), index // 2 + 1)
+
+
+def columnar(triangulation):
+    r"""
+    Return the columnar encoding of `triangulation`.
+
+    The triangulation can be given in either of the encodings of
+    :mod:`ipyvue_flatsurf.encoding.flat_triangulation_encoding`.
+
+    EXAMPLES::
+
+        >>> columnar({'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}})
+        {'vertexPermutation': array([5, 4, 1, 0, 3, 2], dtype=int32), 'vectors': array([[ 1.,  0.],
+               [ 0.,  1.],
+               [-1., -1.]])}
+
+    """
+    if "vertexPermutation" in triangulation:
+        return triangulation
+
+    edges = len(triangulation["vectors"])
+
+    permutation = numpy.empty(2 * edges, dtype=numpy.int32)
+    for vertex in triangulation["vertices"]:
+        cycle = index(vertex)
+        permutation[cycle] = numpy.roll(cycle, -1)
+
+    vectors = numpy.array([[triangulation["vectors"][edge]["x"], triangulation["vectors"][edge]["y"]] for edge in range(1, edges + 1)], dtype=numpy.float64)
+
+    return {"vertexPermutation": permutation, "vectors": vectors}
+
+
+class Layout:
+    r"""
+    A layout of the faces of a triangulation in the plane.
+
+    All arrays are indexed by the index of a half edge.
+
+    - ``vectors`` -- the vector of each half edge
+
+    - ``next_in_face`` -- the index of the next half edge in the same face
+
+    - ``face`` -- a label of the face containing each half edge
+
+    - ``start`` -- the point in the plane where each half edge starts
+
+    - ``inner`` -- whether a half edge is drawn at the same place as its
+      negative, i.e., whether the two faces on its sides are glued along it in
+      the layout
+
+    """
+
+    def __init__(self, vectors, next_in_face, face, start, inner):
+        self.vectors = vectors
+        self.next_in_face = next_in_face
+        self.face = face
+        self.start = start
+        self.inner = inner
+
+    @property
+    def end(self):
+        r"""
+        The point in the plane where each half edge ends.
+        """
+        return self.start + self.vectors
+
+    def face_half_edges(self, halfEdge):
+        r"""
+        Return the indexes of the half edges of the face containing the half
+        edge with index `halfEdge`, starting with `halfEdge`.
+        """
+        face = [halfEdge]
+        while self.next_in_face[face[-1]] != halfEdge:
+            face.append(int(self.next_in_face[face[-1]]))
+        return face
+
+    def bounds(self):
+        r"""
+        Return the lower left and upper right corner of the bounding box of
+        this layout.
+        """
+        return self.start.min(axis=0), self.start.max(axis=0)
+
+    def boundaries(self, selected=None):
+        r"""
+        Return the boundaries of the polygons formed by merging the faces
+        that contain the half edges in the boolean array `selected` along the
+        edges that are glued in this layout.
+
+        Each boundary is an array of the indexes of the half edges along it
+        in order.
+
+        EXAMPLES::
+
+            >>> torus = {'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}}
+            >>> L = layout(torus)
+
+        The two triangles of the torus merge into a square::
+
+            >>> L.boundaries()
+            [array([2, 4, 3, 5])]
+
+        ::
+
+            >>> L.boundaries(numpy.array([True, False, True, False, True, False]))
+            [array([0, 2, 4])]
+
+        """
+        halfEdges = len(self.next_in_face)
+        if selected is None:
+            selected = numpy.ones(halfEdges, dtype=bool)
+        # Select complete faces.
+        selected = numpy.isin(self.face, self.face[selected])
+
+        indexes = numpy.arange(halfEdges)
+        interior = selected & self.inner & selected[indexes ^ 1]
+        boundary = selected & ~interior
+
+        # The next half edge along the boundary: follow the face and turn
+        # around the vertex across the edges that are glued until we reach
+        # the boundary again.
+        following = self.next_in_face.copy()
+        while True:
+            skip = boundary & interior[following]
+            if not skip.any():
+                break
+            following[skip] = self.next_in_face[following[skip] ^ 1]
+
+        boundaries = []
+        visited = ~boundary
+        for first in numpy.flatnonzero(boundary):
+            if visited[first]:
+                continue
+            cycle = [first]
+            visited[first] = True
+            while not visited[following[cycle[-1]]]:
+                cycle.append(following[cycle[-1]])
+                visited[cycle[-1]] = True
+            boundaries.append(numpy.array(cycle))
+
+        return boundaries
+
+    def __repr__(self):
+        return f"Layout of {len(numpy.unique(self.face))} faces"
+
+
+def flat_triangulation_layout(triangulation):
+    r"""
+    Return the :class:`Layout` of the pyflatsurf `triangulation`.
+
+    Use ``cached(flat_triangulation_layout, triangulation)`` from
+    :mod:`ipyvue_flatsurf.encoding.cache` to compute the layout only once
+    per triangulation.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces
+        >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+        >>> T = to_pyflatsurf(translation_surfaces.square_torus())
+
+        >>> from ipyvue_flatsurf.encoding.cache import cached
+        >>> cached(flat_triangulation_layout, T)
+        Layout of 2 faces
+        >>> cached(flat_triangulation_layout, T) is cached(flat_triangulation_layout, T.clone())
+        True
+
+    """
+    from ipyvue_flatsurf.encoding.cache import cached
+    from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation_columnar
+    return layout(cached(encode_flat_triangulation_columnar, triangulation))
+
+
+def layout(triangulation):
+    r"""
+    Return a :class:`Layout` of the encoded `triangulation`.
+
+    EXAMPLES::
+
+        >>> layout({'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}})
+        Layout of 2 faces
+
+    """
+    triangulation = columnar(triangulation)
+
+    next_at_vertex = numpy.asarray(triangulation["vertexPermutation"], dtype=numpy.int64)
+    halfEdges = len(next_at_vertex)
+    indexes = numpy.arange(halfEdges)
+
+    previous_at_vertex = numpy.empty_like(next_at_vertex)
+    previous_at_vertex[next_at_vertex] = indexes
+
+    # nextInFace(he) = previousAtVertex(-he) and the index of -he is the index of he xor 1.
+    next_in_face = previous_at_vertex[indexes ^ 1]
+
+    vectors = numpy.repeat(numpy.asarray(triangulation["vectors"], dtype=numpy.float64), 2, axis=0)
+    vectors[1::2] *= -1
+
+    # Label each face by the smallest index of a half edge in it.
+    face = indexes.copy()
+    while True:
+        label = numpy.minimum(face, face[next_in_face])
+        if numpy.array_equal(label, face):
+            break
+        face = label
+
+    start = numpy.full((halfEdges, 2), numpy.nan)
+    placed = numpy.zeros(halfEdges, dtype=bool)
+
+    def place(entries):
+        r"""
+        Place the faces containing the half edges `entries` (whose start
+        has already been placed) and return all their half edges.
+        """
+        placed[face[entries]] = True
+        current = entries
+        origin = entries
+        faces = [entries]
+        while current.size:
+            following = next_in_face[current]
+            pending = following != origin
+            start[following[pending]] = start[current[pending]] + vectors[current[pending]]
+            current = following[pending]
+            origin = origin[pending]
+            faces.append(current)
+        return numpy.sort(numpy.concatenate(faces))
+
+    # Python floats are much faster than NumPy arrays for the few
+    # coordinates of a single face.
+    xy = vectors.tolist()
+    following = next_in_face.tolist()
+
+    def corners(entry, point):
+        r"""
+        Return the corners of the face of the half edge `entry` if that half
+        edge started at `point`.
+        """
+        (x, y) = point
+        (dx, dy) = xy[entry]
+        (ex, ey) = xy[following[entry]]
+        return ((x, y), (x + dx, y + dy), (x + dx + ex, y + dy + ey))
+
+    # The faces placed so far, bucketed by the cells of a grid that their
+    # bounding boxes overlap, to find the faces a new face could overlap.
+    lengths = numpy.linalg.norm(vectors, axis=1)
+    cell = float(numpy.median(lengths)) if halfEdges and numpy.median(lengths) > 0 else 1.
+    tolerance = 1e-9 * cell
+    grid = {}
+    triangles = {}
+
+    def cells(triangle):
+        xs = [x for (x, y) in triangle]
+        ys = [y for (x, y) in triangle]
+        return [(x, y)
+                for x in range(math.floor(min(xs) / cell), math.floor(max(xs) / cell) + 1)
+                for y in range(math.floor(min(ys) / cell), math.floor(max(ys) / cell) + 1)]
+
+    def fits(triangle):
+        nearby = {label for key in cells(triangle) for label in grid.get(key, ())}
+        return not any(_overlapping(triangle, triangles[label], tolerance) for label in nearby)
+
+    def insert(label, triangle):
+        triangles[label] = triangle
+        for key in cells(triangle):
+            grid.setdefault(key, []).append(label)
+
+    while not placed[face].all():
+        # Start a new component of the layout to the right of everything
+        # placed so far.
+        root = int(numpy.flatnonzero(~placed[face])[0])
+        start[root] = (0, 0) if not placed.any() else (numpy.nanmax(start[:, 0]) + cell, numpy.nanmin(start[:, 1]))
+        insert(face[root], corners(root, start[root].tolist()))
+        frontier = place(numpy.array([root]))
+
+        while frontier.size:
+            negatives = frontier ^ 1
+            pending = ~placed[face[negatives]]
+            frontier = frontier[pending]
+            negatives = negatives[pending]
+
+            # Each face is entered through the first half edge that reaches
+            # it without making it overlap the faces already placed.
+            order = numpy.argsort(face[negatives], kind="stable")
+            entered = []
+            for (through, entry) in zip(frontier[order].tolist(), negatives[order].tolist()):
+                if placed[face[entry]]:
+                    continue
+                # A half edge starts where its negative ends.
+                point = start[through] + vectors[through]
+                triangle = corners(entry, point.tolist())
+                if fits(triangle):
+                    placed[face[entry]] = True
+                    insert(face[entry], triangle)
+                    start[entry] = point
+                    entered.append(entry)
+
+            frontier = place(numpy.array(entered, dtype=numpy.int64))
+
+    end = start + vectors
+    inner = numpy.all(numpy.isclose(start, end[indexes ^ 1]), axis=1) & numpy.all(numpy.isclose(end, start[indexes ^ 1]), axis=1)
+
+    return Layout(vectors=vectors, next_in_face=next_in_face, face=face, start=start, inner=inner)
+
+
+def _overlapping(triangle, other, tolerance):
+    r"""
+    Return whether the interiors of the triangles `triangle` and `other`,
+    given by their corners, intersect by more than `tolerance`.
+
+    EXAMPLES::
+
+        >>> triangle = ((0., 0.), (1., 0.), (0., 1.))
+        >>> _overlapping(triangle, ((1., 0.), (1., 1.), (0., 1.)), 1e-9)
+        False
+        >>> _overlapping(triangle, ((.5, 0.), (1.5, 0.), (.5, 1.)), 1e-9)
+        True
+
+    """
+    # By the separating axis theorem, two triangles are disjoint if their
+    # projections to the normal of one of their edges are disjoint.
+    for corners in (triangle, other):
+        for i in range(3):
+            (x, y) = corners[i]
+            (u, v) = corners[i - 1]
+            normal = (y - v, u - x)
+            length = math.hypot(*normal)
+            if length == 0:
+                continue
+            projected = [normal[0] * px + normal[1] * py for (px, py) in triangle]
+            projected_other = [normal[0] * px + normal[1] * py for (px, py) in other]
+            if max(projected) <= min(projected_other) + tolerance * length or max(projected_other) <= min(projected) + tolerance * length:
+                return False
+    return True
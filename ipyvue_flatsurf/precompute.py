@@ -0,0 +1,452 @@
+r"""
+Precomputes the encodings of many surfaces and writes them to disk.
+
+Encoding large surfaces and their flow decompositions can take a long time.
+This module encodes all the surfaces listed in a manifest on a pool of
+processes and writes the encodings to one file per surface. Loading such a
+file, see :func:`load`, puts its encodings into the encoding cache of
+:mod:`ipyvue_flatsurf.encoding.cache`, so widgets for these surfaces are
+created without encoding anything.
+
+The manifest is a JSON list of entries such as::
+
+    [
+      {"name": "L", "surface": "translation_surfaces.mcmullen_L(1, 1, 1, 1)", "decompositions": 4},
+      {"name": "billiard(1, 2, 4)", "surface": "similarity_surfaces.billiard(polygons.triangle(1, 2, 4)).minimal_cover('translation')"}
+    ]
+
+Each ``surface`` is a Python expression that is evaluated with the contents of
+``flatsurf`` in scope, so manifests must come from a trusted source. The
+optional ``decompositions`` is the number of flow decompositions to encode
+(default ``0``) and ``bound`` limits the length of the saddle connections
+that define their directions (default ``64``.)
+
+From the command line, this runs as::
+
+    python -m ipyvue_flatsurf.precompute manifest.json --output precomputed/
+
+The progress is recorded in ``progress.json`` in the output directory. When
+the command is interrupted, running it again only encodes the entries that
+are not done yet.
+
+EXAMPLES::
+
+    >>> import json, os, tempfile
+    >>> output = tempfile.mkdtemp()
+    >>> manifest = [{"name": "torus", "surface": "translation_surfaces.square_torus()", "decompositions": 1}]
+    >>> progress = precompute(manifest, output, processes=1)
+    >>> progress["entries"]["torus"]
+    {'status': 'done', 'file': 'torus.npz', 'encodings': ..., 'seconds': ...}
+
+Entries that are done are not encoded again::
+
+    >>> precompute(manifest, output, processes=1)["entries"]["torus"] == progress["entries"]["torus"]
+    True
+
+Widgets can start from the precomputed encodings::
+
+    >>> from ipyvue_flatsurf.encoding.cache import cache_clear, cache_info
+    >>> cache_clear()
+    >>> load(os.path.join(output, "torus.npz")) == progress["entries"]["torus"]["encodings"]
+    True
+
+    >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+    >>> S = translation_surfaces.square_torus()
+    >>> D = next(GL2ROrbitClosure(S.erase_marked_points()).decompositions(bound=64))
+
+    >>> from ipyvue_flatsurf import Widget
+    >>> W = Widget(D)
+    >>> cache_info().misses
+    0
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+import json
+import os
+
+# The version of the file format written by this module.
+VERSION = 1
+
+FORMATS = ["npz", "json"]
+
+PROGRESS = "progress.json"
+
+
+def read_manifest(path):
+    r"""
+    Return the entries of the manifest at `path`.
+
+    EXAMPLES::
+
+        >>> import tempfile
+        >>> with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as manifest:
+        ...     _ = manifest.write('[{"name": "torus", "surface": "translation_surfaces.square_torus()"}]')
+        >>> read_manifest(manifest.name)
+        [{'name': 'torus', 'surface': 'translation_surfaces.square_torus()', 'decompositions': 0, 'bound': 64}]
+
+    """
+    with open(path) as manifest:
+        return _validate(json.load(manifest))
+
+
+def _validate(entries):
+    r"""
+    Return the manifest `entries` with defaults filled in.
+
+    EXAMPLES::
+
+        >>> _validate([{"name": "torus"}])
+        Traceback (most recent call last):
+        ...
+        ValueError: manifest entry 0 must have a name and a surface
+        >>> _validate([{"name": "torus", "surface": "S"}, {"name": "torus", "surface": "T"}])
+        Traceback (most recent call last):
+        ...
+        ValueError: manifest entry 1 has the same file name as another entry
+
+    """
+    validated = []
+    files = set()
+
+    for (i, entry) in enumerate(entries):
+        if not isinstance(entry, dict) or "name" not in entry or "surface" not in entry:
+            raise ValueError(f"manifest entry {i} must have a name and a surface")
+
+        unknown = set(entry) - {"name", "surface", "decompositions", "bound"}
+        if unknown:
+            raise ValueError(f"manifest entry {i} has unknown keys {', '.join(sorted(unknown))}")
+
+        if _filename(entry["name"]) in files:
+            raise ValueError(f"manifest entry {i} has the same file name as another entry")
+        files.add(_filename(entry["name"]))
+
+        validated.append({
+            "name": entry["name"],
+            "surface": entry["surface"],
+            "decompositions": entry.get("decompositions", 0),
+            "bound": entry.get("bound", 64),
+        })
+
+    return validated
+
+
+def _filename(name):
+    r"""
+    Return the file name (without extension) for the entry called `name`.
+
+    EXAMPLES::
+
+        >>> _filename("billiard(1, 2, 4)")
+        'billiard_1_2_4_'
+
+    """
+    import re
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+
+def precompute(entries, output, format="npz", processes=None, force=False):
+    r"""
+    Encode the surfaces of the manifest `entries` on `processes` processes
+    and write them to the directory `output` in `format`.
+
+    Returns the progress manifest, which is also written to ``progress.json``
+    in `output`. Entries that are recorded as done there are skipped unless
+    `force` is set.
+
+    If `processes` is ``1``, everything is encoded in the current process.
+    If it is ``None``, as many processes as there are CPUs are used.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"unknown format '{format}', must be one of {', '.join(FORMATS)}")
+
+    entries = _validate(entries)
+    os.makedirs(output, exist_ok=True)
+
+    progress = {"version": VERSION, "format": format, "entries": {}}
+    if not force and os.path.exists(os.path.join(output, PROGRESS)):
+        with open(os.path.join(output, PROGRESS)) as previous:
+            previous = json.load(previous)
+        if previous.get("version") == VERSION and previous.get("format") == format:
+            progress = previous
+
+    def done(entry):
+        record = progress["entries"].get(entry["name"])
+        return record is not None and record["status"] == "done" and os.path.exists(os.path.join(output, record["file"]))
+
+    pending = [entry for entry in entries if not done(entry)]
+
+    def record(entry, result):
+        progress["entries"][entry["name"]] = result
+        _write_progress(output, progress)
+
+    if processes == 1 or len(pending) <= 1:
+        for entry in pending:
+            record(entry, _precompute(entry, output, format))
+        return progress
+
+    # pyflatsurf objects live in cppyy which does not survive forking, so we
+    # start fresh processes that each load flatsurf themselves.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(_precompute, entry, output, format): entry for entry in pending}
+        for future in as_completed(futures):
+            record(futures[future], future.result())
+
+    return progress
+
+
+def _write_progress(output, progress):
+    r"""
+    Write the `progress` manifest to `output` such that an interrupted
+    write does not destroy the previous progress.
+    """
+    path = os.path.join(output, PROGRESS)
+    with open(path + ".tmp", "w") as file:
+        json.dump(progress, file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _precompute(entry, output, format):
+    r"""
+    Encode the surface of the manifest `entry`, write it to `output`, and
+    return a record for the progress manifest.
+    """
+    import time
+    start = time.perf_counter()
+
+    try:
+        encodings = encode_entry(entry)
+        file = f"{_filename(entry['name'])}.{format}"
+        write(os.path.join(output, file), encodings, format=format)
+    except Exception as e:
+        return {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+
+    return {"status": "done", "file": file, "encodings": len(encodings), "seconds": time.perf_counter() - start}
+
+
+def encode_entry(entry):
+    r"""
+    Return the encodings of the surface of the manifest `entry` as a list
+    of pairs of cache keys and encoded values.
+
+    The triangulation is encoded in the columnar encoding that is used by
+    the default binary codec. Flow components are encoded for the
+    decompositions of the surface without marked points, i.e., the way
+    :func:`ipyvue_flatsurf.widget.Widget` encodes them for such a
+    decomposition.
+
+    EXAMPLES::
+
+        >>> encodings = encode_entry({"name": "torus", "surface": "translation_surfaces.square_torus()", "decompositions": 1, "bound": 64})
+        >>> sorted({key[1] for (key, value) in encodings})
+        ['encode_flat_triangulation_columnar', 'encode_flow_component']
+
+    """
+    import flatsurf
+    from itertools import islice
+    from ipyvue_flatsurf.conversion import to_pyflatsurf
+    from ipyvue_flatsurf.encoding.cache import encoding_key
+    from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation_columnar
+    from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+
+    surface = eval(entry["surface"], vars(flatsurf).copy())
+
+    encodings = {}
+
+    def encode(encoder, *args):
+        key, _ = encoding_key(encoder, *args)
+        if key not in encodings:
+            encodings[key] = encoder(*args)
+
+    encode(encode_flat_triangulation_columnar, to_pyflatsurf(surface))
+
+    if entry["decompositions"]:
+        orbit_closure = flatsurf.GL2ROrbitClosure(surface.erase_marked_points())
+        for decomposition in islice(orbit_closure.decompositions(bound=entry["bound"]), entry["decompositions"]):
+            encode(encode_flat_triangulation_columnar, decomposition.surface())
+            for component in decomposition.components():
+                encode(encode_flow_component, component, None, True)
+
+    return list(encodings.items())
+
+
+def write(path, encodings, format="npz"):
+    r"""
+    Write `encodings`, pairs of cache keys and encoded values, to `path`.
+
+    NumPy arrays are stored as binary data in the ``npz`` format and as
+    lists in the ``json`` format.
+
+    EXAMPLES::
+
+        >>> import numpy, os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), "encodings.json")
+        >>> write(path, [(("module", "encode", ("triangulation", b"\x00")), {"vectors": numpy.zeros((1, 2))})], format="json")
+        >>> read(path)
+        [(('module', 'encode', ('triangulation', b'\x00')), {'vectors': array([[0., 0.]])})]
+
+    """
+    import numpy
+
+    arrays = []
+    header = {
+        "version": VERSION,
+        "encodings": [{"key": _dump_key(key), "value": _extract_arrays(value, arrays)} for (key, value) in encodings],
+    }
+
+    if format == "npz":
+        numpy.savez_compressed(path, header=numpy.array(json.dumps(header)), **{f"array_{i}": array for (i, array) in enumerate(arrays)})
+    elif format == "json":
+        header["arrays"] = [array.tolist() for array in arrays]
+        with open(path, "w") as file:
+            json.dump(header, file, separators=(",", ":"))
+    else:
+        raise ValueError(f"unknown format '{format}', must be one of {', '.join(FORMATS)}")
+
+
+def read(path):
+    r"""
+    Return the encodings written to `path` with :func:`write`.
+    """
+    import numpy
+
+    if path.endswith(".npz"):
+        with numpy.load(path) as npz:
+            header = json.loads(str(npz["header"]))
+            arrays = [npz[f"array_{i}"] for i in range(len(npz.files) - 1)]
+    else:
+        with open(path) as file:
+            header = json.load(file)
+        arrays = header.pop("arrays")
+
+    if header.get("version") != VERSION:
+        raise ValueError(f"{path} was written by an incompatible version of ipyvue-flatsurf")
+
+    return [(_load_key(encoding["key"]), _restore_arrays(encoding["value"], arrays)) for encoding in header["encodings"]]
+
+
+def load(path):
+    r"""
+    Put the encodings written to `path` with :func:`write` into the encoding
+    cache and return their number.
+
+    Widgets for the surfaces of `path` then use these encodings instead of
+    encoding the surfaces themselves.
+    """
+    from ipyvue_flatsurf.encoding.cache import cache
+
+    encodings = read(path)
+    for (key, value) in encodings:
+        cache.put(key, value)
+    return len(encodings)
+
+
+def _dump_key(key):
+    r"""
+    Return the cache `key` in a form that can be written to JSON.
+
+    EXAMPLES::
+
+        >>> _dump_key(("module", "encode", ("triangulation", b"\xff"), None))
+        ['module', 'encode', ['triangulation', {'$bytes': 'ff'}], None]
+
+    """
+    if isinstance(key, tuple):
+        if key and key[0] == "id":
+            raise ValueError("cannot write encodings that depend on the identity of an object")
+        return [_dump_key(part) for part in key]
+    if isinstance(key, bytes):
+        return {"$bytes": key.hex()}
+    return key
+
+
+def _load_key(key):
+    r"""
+    Return the cache key written with :func:`_dump_key`.
+
+    EXAMPLES::
+
+        >>> _load_key(['module', 'encode', ['triangulation', {'$bytes': 'ff'}], None])
+        ('module', 'encode', ('triangulation', b'\xff'), None)
+
+    """
+    if isinstance(key, list):
+        return tuple(_load_key(part) for part in key)
+    if isinstance(key, dict):
+        return bytes.fromhex(key["$bytes"])
+    return key
+
+
+def _extract_arrays(x, arrays):
+    r"""
+    Return `x` with all NumPy arrays replaced by references into `arrays`.
+    """
+    if isinstance(x, dict):
+        return {key: _extract_arrays(value, arrays) for (key, value) in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_extract_arrays(value, arrays) for value in x]
+    if hasattr(x, "__array_interface__"):
+        arrays.append(x)
+        return {"$array": len(arrays) - 1, "dtype": x.dtype.name, "shape": list(x.shape)}
+    return x
+
+
+def _restore_arrays(x, arrays):
+    r"""
+    Return `x` with all references into `arrays` replaced by NumPy arrays.
+    """
+    if isinstance(x, dict):
+        if "$array" in x:
+            import numpy
+            return numpy.asarray(arrays[x["$array"]], dtype=x["dtype"]).reshape(x["shape"])
+        return {key: _restore_arrays(value, arrays) for (key, value) in x.items()}
+    if isinstance(x, list):
+        return [_restore_arrays(value, arrays) for value in x]
+    return x
+
+
+def main(argv=None):
+    r"""
+    Run the precomputation from the command line.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m ipyvue_flatsurf.precompute", description="Encode the surfaces of a manifest for ipyvue-flatsurf widgets.")
+    parser.add_argument("manifest", help="a JSON file listing the surfaces to encode")
+    parser.add_argument("--output", "-o", default=".", help="the directory to write the encodings and the progress manifest to")
+    parser.add_argument("--format", choices=FORMATS, default="npz", help="the file format of the encodings")
+    parser.add_argument("--processes", "-j", type=int, default=None, help="the number of processes to encode on (default: number of CPUs)")
+    parser.add_argument("--force", action="store_true", help="encode all surfaces again, even if they are done already")
+    args = parser.parse_args(argv)
+
+    progress = precompute(read_manifest(args.manifest), args.output, format=args.format, processes=args.processes, force=args.force)
+
+    failed = {name: record for (name, record) in progress["entries"].items() if record["status"] != "done"}
+    for (name, record) in failed.items():
+        print(f"{name}: {record['error']}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,416 @@
+r"""
+Renders encoded flatsurf objects as SVG without a frontend.
+
+The renderer consumes the same encodings that are sent to vue-flatsurf,
+see :mod:`ipyvue_flatsurf.encoding`, and lays out the triangulation with
+:mod:`ipyvue_flatsurf.layout`. Since the encodings are plain Python and NumPy
+objects, many figures can be rendered on a pool of processes, see
+:func:`render_svgs`.
+
+EXAMPLES::
+
+    >>> torus = {'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}}
+    >>> print(render_svg(torus, labels=None))
+    <svg xmlns="http://www.w3.org/2000/svg" width="400" height="733" viewBox="-0.1 -1.1 1.2 2.2">
+    <g stroke-linecap="round" stroke-linejoin="round">
+    <path d="M0,0L1,0L1,-1ZM1,0L0,0L0,1Z" fill="#f4f4f4" stroke="none"/>
+    <path d="M1,0L1,-1M0,0L0,1M1,-1L0,0M0,1L1,0" fill="none" stroke="#000" stroke-width="0.01"/>
+    <path d="M0,0L1,0" fill="none" stroke="#bbb" stroke-width="0.01" stroke-dasharray="0.04"/>
+    </g>
+    </svg>
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+import numpy
+
+# The colors of flow components, cylinders first, then minimal components.
+CYLINDER_COLORS = ["#a6cee3", "#b2df8a", "#fdbf6f", "#cab2d6", "#fb9a99", "#ffff99"]
+MINIMAL_COLOR = "#e0e0e0"
+
+
+def render_svg(triangulation, flow_components=(), saddle_connections=(), paths=(), labels="OUTER", width=400, detail="full", region=None):
+    r"""
+    Return an SVG drawing of the encoded `triangulation` together with the
+    encoded `flow_components`, `saddle_connections`, and `paths`.
+
+    INPUT:
+
+    - ``triangulation`` -- a triangulation encoded with either of the
+      encodings in :mod:`ipyvue_flatsurf.encoding.flat_triangulation_encoding`
+      or its :class:`ipyvue_flatsurf.layout.Layout`
+
+    - ``flow_components`` -- a list of flow components encoded with
+      :func:`ipyvue_flatsurf.encoding.flow_component_encoding.encode_flow_component`
+
+    - ``saddle_connections`` -- a list of saddle connections encoded with
+      :func:`ipyvue_flatsurf.encoding.saddle_connection_encoding.encode_saddle_connection`
+
+    - ``paths`` -- a list of paths encoded with
+      :func:`ipyvue_flatsurf.encoding.path_encoding.encode_path`
+
+    - ``labels`` -- the kind of edge labels, one of ``"OUTER"``,
+      ``"NUMERIC"``, ``"MIXED"``, or ``None``, with the same meaning as
+      :attr:`ipyvue_flatsurf.widgets.vue_flatsurf_widget.VueFlatsurfWidget.labels`
+
+    - ``width`` -- the width of the SVG in pixels
+
+    - ``detail`` -- either ``"full"`` to draw every triangle or
+      ``"overview"`` to merge the triangles that are glued in the layout into
+      polygons, omit labels, and draw saddle connections without stopping at
+      every edge they cross, see :mod:`ipyvue_flatsurf.encoding.detail`
+
+    - ``region`` -- the ids of half edges whose faces are drawn in full
+      detail with numeric labels even if ``detail`` is ``"overview"``
+
+    EXAMPLES::
+
+        >>> torus = {'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}}
+        >>> connection = {'source': -3, 'target': 3, 'vector': {'x': 1.0, 'y': 3.0}, 'crossings': []}
+        >>> svg = render_svg(torus, saddle_connections=[connection], labels="NUMERIC")
+        >>> print(svg)
+        <svg ...>
+        ...
+        <path d="M0,1L0.333333,0L0.5,-0.5M0.5,0.5L0.666667,0L1,-1" fill="none" stroke="#d62728" stroke-width="0.02"/>
+        <text x="0.5" y="-0.1" font-size="0.08" text-anchor="middle" dominant-baseline="middle">1</text>
+        ...
+        </svg>
+
+    In an overview, the square torus is drawn as a single square and the
+    connection is made of straight segments::
+
+        >>> print(render_svg(torus, saddle_connections=[connection], detail="overview"))
+        <svg ...>
+        <g stroke-linecap="round" stroke-linejoin="round">
+        <path d="M1,0L1,-1L0,0L0,1Z" fill="#f4f4f4" stroke="none"/>
+        <path d="M1,0L1,-1M0,0L0,1M1,-1L0,0M0,1L1,0" fill="none" stroke="#000" stroke-width="0.01"/>
+        <path d="M0,1L0.5,-0.5M0.5,0.5L1,-1" fill="none" stroke="#d62728" stroke-width="0.02"/>
+        </g>
+        </svg>
+
+    """
+    from ipyvue_flatsurf.layout import Layout, layout, index
+
+    if detail not in ["full", "overview"]:
+        raise ValueError(f"unsupported level of detail '{detail}', must be full or overview")
+
+    L = triangulation if isinstance(triangulation, Layout) else layout(triangulation)
+    halfEdges = len(L.start)
+    overview = detail == "overview"
+
+    # The half edges in faces that are drawn in full detail.
+    regional = numpy.full(halfEdges, not overview)
+    if overview and region:
+        regional = numpy.isin(L.face, L.face[index(numpy.asarray(list(region), dtype=numpy.int64))])
+
+    # SVG coordinates grow downwards.
+    flip = numpy.array([1., -1.])
+    start = L.start * flip
+    end = L.end * flip
+
+    lower, upper = start.min(axis=0), start.max(axis=0)
+    size = max(float((upper - lower).max()), 1e-9)
+    margin = size / 20
+    lower = lower - margin
+    extent = upper - lower + margin
+    stroke = size / 200
+    height = int(round(width * extent[1] / extent[0]))
+
+    faces = [L.face_half_edges(halfEdge) for halfEdge in numpy.unique(L.face)]
+
+    def polygons(selected=None):
+        if overview:
+            return [start[boundary] for boundary in L.boundaries(selected)]
+        return [start[face] for face in faces if selected is None or selected[face[0]]]
+
+    svg = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="{_number(lower[0])} {_number(lower[1])} {_number(extent[0])} {_number(extent[1])}">',
+        '<g stroke-linecap="round" stroke-linejoin="round">',
+        _path(_polygons(polygons()), fill="#f4f4f4", stroke="none"),
+    ]
+
+    def fill(component, color):
+        # Fill the faces that are completely inside the component.
+        inside = numpy.zeros(halfEdges, dtype=bool)
+        inside[index(numpy.asarray(component["inside"], dtype=numpy.int64))] = True
+        partial = numpy.zeros(halfEdges, dtype=bool)
+        partial[L.face[~inside]] = True
+        filled = polygons(~partial[L.face])
+        if filled:
+            svg.append(_path(_polygons(filled), fill=color, stroke="none", **{"fill-opacity": "0.8"}))
+
+    cylinders = 0
+    for component in flow_components:
+        if component["cylinder"]:
+            fill(component, CYLINDER_COLORS[cylinders % len(CYLINDER_COLORS)])
+            cylinders += 1
+        else:
+            fill(component, MINIMAL_COLOR)
+
+    outer = ~L.inner
+    svg.append(_path(_segments(start[outer], end[outer]), fill="none", stroke="#000", **{"stroke-width": _number(stroke)}))
+
+    # Draw glued edges only once.
+    inner = L.inner & regional & (numpy.arange(halfEdges) % 2 == 0)
+    if inner.any():
+        svg.append(_path(_segments(start[inner], end[inner]), fill="none", stroke="#bbb", **{"stroke-width": _number(stroke), "stroke-dasharray": _number(4 * stroke)}))
+
+    def connections(connections, color, width):
+        polylines = [polyline * flip for connection in connections for polyline in trace(L, connection)]
+        if overview:
+            polylines = [_collapse(polyline) for polyline in polylines]
+        if polylines:
+            svg.append(_path(_polylines(polylines), fill="none", stroke=color, **{"stroke-width": _number(width)}))
+
+    connections([connection for component in flow_components for connection in component["perimeter"]], "#333", stroke)
+    connections(saddle_connections, "#d62728", 2 * stroke)
+    connections([connection for path in paths for connection in path["connections"]], "#1f77b4", 3 * stroke)
+
+    if overview:
+        labels = "NUMERIC" if region else None
+    svg.extend(_labels(L, start, end, labels, size, regional))
+
+    svg.append("</g>")
+    svg.append("</svg>")
+    return "\n".join(svg)
+
+
+def trace(layout, connection):
+    r"""
+    Return the polylines that make up the saddle connection `connection` in
+    `layout`.
+
+    The connection is traced from its source vertex through the faces of the
+    layout. Each time it leaves a face across an edge that is not glued in
+    the layout, a new polyline starts.
+
+    EXAMPLES::
+
+        >>> from ipyvue_flatsurf.layout import layout
+        >>> torus = {'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}}
+        >>> L = layout(torus)
+
+    A connection along an edge::
+
+        >>> trace(L, {'source': 1, 'target': -1, 'vector': {'x': 1.0, 'y': 0.0}})
+        [array([[0., 0.],
+               [1., 0.]])]
+
+    A connection that crosses the glued edge ``1`` without interruption::
+
+        >>> trace(L, {'source': -3, 'target': 3, 'vector': {'x': 1.0, 'y': 2.0}})
+        [array([[ 0. , -1. ],
+               [ 0.5,  0. ],
+               [ 1. ,  1. ]])]
+
+    A connection that crosses the edge ``3`` which is not glued in the
+    layout::
+
+        >>> trace(L, {'source': -3, 'target': 3, 'vector': {'x': 1.0, 'y': 3.0}})
+        [array([[ 0.        , -1.        ],
+               [ 0.33333333,  0.        ],
+               [ 0.5       ,  0.5       ]]), array([[ 0.5       , -0.5       ],
+               [ 0.66666667,  0.        ],
+               [ 1.        ,  1.        ]])]
+
+    """
+    from ipyvue_flatsurf.layout import index
+
+    halfEdge = int(index(connection["source"]))
+    vector = numpy.array([connection["vector"]["x"], connection["vector"]["y"]], dtype=numpy.float64)
+
+    point = layout.start[halfEdge]
+    face = layout.face_half_edges(halfEdge)
+    # The part of the vector that has not been traced yet.
+    remaining = 1.
+    polylines = [[point]]
+
+    for _ in range(4 * len(layout.start) + 4):
+        # Solve point + s * vector = start + t * edge for all edges of the face at once.
+        starts = layout.start[face]
+        edges = layout.vectors[face]
+        determinant = edges[:, 0] * vector[1] - edges[:, 1] * vector[0]
+        offset = starts - point
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            s = (edges[:, 0] * offset[:, 1] - edges[:, 1] * offset[:, 0]) / determinant
+            t = (vector[0] * offset[:, 1] - vector[1] * offset[:, 0]) / determinant
+
+        eps = 1e-9
+        exits = (numpy.abs(determinant) > eps * numpy.linalg.norm(edges, axis=1) * numpy.linalg.norm(vector)) & (s > eps) & (t >= -eps) & (t <= 1 + eps)
+        if not exits.any() or s[exits].min() >= remaining - eps:
+            polylines[-1].append(point + remaining * vector)
+            break
+
+        exit = numpy.flatnonzero(exits)[numpy.argmin(s[exits])]
+        point = point + s[exit] * vector
+        remaining -= s[exit]
+        polylines[-1].append(point)
+
+        # Continue on the other side of the edge.
+        halfEdge = face[exit] ^ 1
+        point = layout.start[halfEdge] + (1 - t[exit]) * layout.vectors[halfEdge]
+        face = layout.face_half_edges(halfEdge)
+        if not numpy.allclose(point, polylines[-1][-1]):
+            polylines.append([point])
+
+    return [numpy.array(polyline) for polyline in polylines if len(polyline) > 1]
+
+
+def render_svgs(figures, processes=None):
+    r"""
+    Return the SVGs for all `figures`, rendered on a pool of `processes`.
+
+    Each figure is a dict of keyword arguments for :func:`render_svg`. Since
+    the figures only consist of encoded objects, they can be sent to other
+    processes, unlike the flatsurf objects they were created from.
+
+    If `processes` is ``1``, everything is rendered in the current process.
+    If it is ``None``, as many processes as there are CPUs are used.
+
+    EXAMPLES::
+
+        >>> torus = {'vertices': [[1, -3, 2, -1, 3, -2]], 'vectors': {1: {'x': 1.0, 'y': 0.0}, 2: {'x': 0.0, 'y': 1.0}, 3: {'x': -1.0, 'y': -1.0}}}
+        >>> figures = [{"triangulation": torus, "labels": labels} for labels in ["OUTER", "NUMERIC", None]]
+        >>> render_svgs(figures, processes=2) == [render_svg(**figure) for figure in figures]
+        True
+
+    """
+    figures = list(figures)
+
+    if processes == 1 or len(figures) <= 1:
+        return [_render(figure) for figure in figures]
+
+    import os
+    processes = processes or os.cpu_count() or 1
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        chunksize = max(1, len(figures) // (4 * processes))
+        return list(pool.map(_render, figures, chunksize=chunksize))
+
+
+def _render(figure):
+    return render_svg(**figure)
+
+
+def _labels(layout, start, end, labels, size, selected):
+    r"""
+    Return the SVG text elements labeling the `selected` half edges of
+    `layout`.
+    """
+    if labels is None:
+        return []
+
+    if labels not in ["OUTER", "NUMERIC", "MIXED"]:
+        raise ValueError(f"unsupported labels '{labels}', must be one of OUTER, NUMERIC, MIXED, or None")
+
+    halfEdges = numpy.arange(len(start))
+    # Move labels slightly into the face of their half edge.
+    direction = end - start
+    normal = numpy.stack([direction[:, 1], -direction[:, 0]], axis=1)
+    normal /= numpy.maximum(numpy.linalg.norm(normal, axis=1), 1e-12)[:, None]
+    position = (start + end) / 2 + normal * size / 20
+
+    text = {}
+    if labels in ["NUMERIC", "MIXED"]:
+        for halfEdge in halfEdges[layout.inner if labels == "MIXED" else slice(None)]:
+            text[halfEdge] = str(halfEdge // 2 + 1 if halfEdge % 2 == 0 else -(halfEdge // 2 + 1))
+    if labels in ["OUTER", "MIXED"]:
+        outer = numpy.unique(halfEdges[~layout.inner] // 2)
+        for (i, edge) in enumerate(outer):
+            for halfEdge in [2 * edge, 2 * edge + 1]:
+                text[halfEdge] = _letters(i)
+
+    font = _number(size / 25)
+    return [f'<text x="{_number(position[halfEdge, 0])}" y="{_number(position[halfEdge, 1])}" font-size="{font}" text-anchor="middle" dominant-baseline="middle">{label}</text>' for (halfEdge, label) in sorted(text.items()) if selected[halfEdge]]
+
+
+def _collapse(polyline):
+    r"""
+    Return `polyline` without the points where it continues in a straight
+    line.
+
+    EXAMPLES::
+
+        >>> _collapse(numpy.array([[0., 0.], [1., 1.], [2., 2.], [2., 3.]]))
+        array([[0., 0.],
+               [2., 2.],
+               [2., 3.]])
+
+    """
+    before = polyline[1:-1] - polyline[:-2]
+    after = polyline[2:] - polyline[1:-1]
+    cross = before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0]
+    straight = numpy.abs(cross) <= 1e-9 * numpy.linalg.norm(before, axis=1) * numpy.linalg.norm(after, axis=1)
+    return polyline[numpy.concatenate([[True], ~straight, [True]])]
+
+
+def _letters(n):
+    r"""
+    Return the `n`-th label in the sequence ``a, …, z, aa, ab, …``.
+
+    EXAMPLES::
+
+        >>> _letters(0), _letters(25), _letters(26)
+        ('a', 'z', 'aa')
+
+    """
+    label = ""
+    n += 1
+    while n:
+        n, digit = divmod(n - 1, 26)
+        label = chr(ord("a") + digit) + label
+    return label
+
+
+def _number(x):
+    r"""
+    Return `x` formatted compactly for SVG.
+
+    EXAMPLES::
+
+        >>> _number(1.0), _number(-0.0), _number(1/3)
+        ('1', '0', '0.333333')
+
+    """
+    x = float(x)
+    text = f"{x:.6g}"
+    return "0" if text == "-0" else text
+
+
+def _points(points):
+    return "L".join(f"{_number(x)},{_number(y)}" for (x, y) in points)
+
+
+def _segments(starts, ends):
+    return "".join(f"M{_points([a, b])}" for (a, b) in zip(starts, ends))
+
+
+def _polylines(polylines):
+    return "".join(f"M{_points(polyline)}" for polyline in polylines)
+
+
+def _polygons(polygons):
+    return "".join(f"M{_points(polygon)}Z" for polygon in polygons)
+
+
+def _path(d, **attributes):
+    attributes = " ".join(f'{key}="{value}"' for (key, value) in attributes.items())
+    return f'<path d="{d}" {attributes}/>'
@@ -41,10 +41,14 @@ from flatsurf.geometry.surface import Surface_base
 from flatsurf.geometry.categories import TranslationSurfaces
 
 
-def Widget(x, *args, **kwargs):
+def Widget(x, *args, precomputed=None, **kwargs):
     r"""
     Create a widget from `x`.
 
+    If `precomputed` is a path (or a list of paths) to files written by
+    :mod:`ipyvue_flatsurf.precompute`, the encodings in these files are
+    used instead of encoding `x` again.
+
     EXAMPLES:
 
     A widget from a sage-flatsurf translation surface::
@@ -74,7 +78,21 @@ def Widget(x, *args, **kwargs):
     >>> Widget(components)
     FlowComponentWidget(...)
 
+    A widget from encodings that were computed earlier::
+
+    >>> import os, tempfile
+    >>> from ipyvue_flatsurf.precompute import precompute
+    >>> output = tempfile.mkdtemp()
+    >>> _ = precompute([{"name": "torus", "surface": "translation_surfaces.square_torus()"}], output)
+    >>> Widget(S, precomputed=os.path.join(output, "torus.npz"))
+    TranslationSurfaceWidget(...)
+
     """
+    if precomputed is not None:
+        from ipyvue_flatsurf.precompute import load
+        for path in [precomputed] if isinstance(precomputed, str) else precomputed:
+            load(path)
+
     if isinstance(x, Parent) and x in TranslationSurfaces().FiniteType().WithoutBoundary():
         from ipyvue_flatsurf.widgets.translation_surface_widget import TranslationSurfaceWidget
         return TranslationSurfaceWidget(x, *args, **kwargs)
@@ -177,5 +195,22 @@ def is_flat_triangulation(x):
     return "flatsurf.FlatTriangulation<" in str(type(x))
 
 
+def LazyWidget(x, *args, **kwargs):
+    r"""
+    Return a placeholder that creates a widget for `x` only when it is
+    actually displayed in a frontend.
+
+    EXAMPLES::
+
+        >>> from flatsurf import translation_surfaces
+        >>> S = translation_surfaces.square_torus()
+        >>> LazyWidget(S).widget
+        TranslationSurfaceWidget(...)
+
+    """
+    from ipyvue_flatsurf.widgets.lazy_widget import LazyWidget
+    return LazyWidget(lambda: Widget(x, *args, **kwargs), repr(x))
+
+
 # Surface_base._ipython_display_ = lambda self: Widget(self)._ipython_display_()
-Surface_base._repr_mimebundle_ = lambda self, *args, **kwargs: Widget(self)._repr_mimebundle_(*args, **kwargs)
+Surface_base._repr_mimebundle_ = lambda self, *args, **kwargs: LazyWidget(self)._repr_mimebundle_(*args, **kwargs)
@@ -41,5 +41,5 @@ from ipyvue_flatsurf.widgets.vue_flatsurf_widget import VueFlatsurfWidget
 
 
 class FlatTriangulationWidget(VueFlatsurfWidget):
-    def __init__(self, triangulation):
-        VueFlatsurfWidget.__init__(self, triangulation)
+    def __init__(self, triangulation, **kwargs):
+        VueFlatsurfWidget.__init__(self, triangulation, **kwargs)
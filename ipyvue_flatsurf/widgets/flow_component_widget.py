@@ -62,7 +62,7 @@ from ipyvue_flatsurf.widgets.vue_flatsurf_widget import VueFlatsurfWidget
 
 
 class FlowComponentWidget(VueFlatsurfWidget):
-    def __init__(self, components, deformation=None):
+    def __init__(self, components, deformation=None, progressive=False, processes=1, **kwargs):
         from ipyvue_flatsurf.widget import is_iterable
         if not is_iterable(components):
             components = [components]
@@ -76,6 +76,6 @@ class FlowComponentWidget(VueFlatsurfWidget):
             triangulation = deformation.codomain()
         else:
             triangulation = components[0].decomposition().surface()
-        VueFlatsurfWidget.__init__(self, triangulation)
+        VueFlatsurfWidget.__init__(self, triangulation, **kwargs)
 
-        self.set_flow_components(components, deformation)
+        self.set_flow_components(components, deformation, progressive=progressive, processes=processes)
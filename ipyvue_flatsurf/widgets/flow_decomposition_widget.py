@@ -17,6 +17,18 @@ Typically, this module is not used directly, but the widget created through the
     >>> Widget(D)
     FlowDecompositionWidget(...)
 
+In a Jupyter notebook, the surface can be shown right away and the flow
+components filled in progressively, see
+:meth:`VueFlatsurfWidget.set_flow_components`::
+
+    >>> Widget(D, progressive=True)
+    FlowDecompositionWidget(...)
+
+Decompositions with many components can be encoded on several processes::
+
+    >>> Widget(D, processes=2)
+    FlowDecompositionWidget(...)
+
 We can also pull back components through a deformation such as the one that is
 eliminating marked points::
 
@@ -60,11 +72,11 @@ from ipyvue_flatsurf.widgets.vue_flatsurf_widget import VueFlatsurfWidget
 
 
 class FlowDecompositionWidget(VueFlatsurfWidget):
-    def __init__(self, decomposition, deformation=None):
+    def __init__(self, decomposition, deformation=None, progressive=False, processes=1, **kwargs):
         if deformation is not None:
             triangulation = deformation.codomain()
         else:
             triangulation = decomposition.surface()
-        VueFlatsurfWidget.__init__(self, triangulation)
+        VueFlatsurfWidget.__init__(self, triangulation, **kwargs)
 
-        self.set_flow_components(decomposition.components(), deformation)
+        self.set_flow_components(decomposition.components(), deformation, progressive=progressive, processes=processes)
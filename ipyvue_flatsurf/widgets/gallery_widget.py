@@ -0,0 +1,317 @@
+r"""
+A Jupyter Widget that shows thumbnails of many surfaces or flow
+decompositions in a paginated grid.
+
+EXAMPLES::
+
+    >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+    >>> S = translation_surfaces.mcmullen_L(1, 1, 1, 1)
+    >>> O = GL2ROrbitClosure(S)
+
+    >>> G = GalleryWidget(O.decompositions(bound=64), page_size=4)
+    >>> G
+    GalleryWidget(...)
+
+Only the items on the current page are turned into widgets::
+
+    >>> G.page
+    0
+    >>> G.widgets
+    [FlowDecompositionWidget(...), FlowDecompositionWidget(...), FlowDecompositionWidget(...), FlowDecompositionWidget(...)]
+
+    >>> G.next()
+    >>> G.page
+    1
+    >>> G.previous()
+    >>> G.page
+    0
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from traitlets import Int, Bool
+
+from ipyvue_flatsurf.widgets.javascript_vue_widget import JavaScriptVueWidget
+
+
+class GalleryWidget(JavaScriptVueWidget):
+    r"""
+    A paginated grid of thumbnails for the surfaces or flow decompositions
+    produced by `items`.
+
+    Items are only pulled from `items` when they are needed. Only the items
+    on the current page are shown by live widgets. While the current page is
+    shown, the items on the next page are pulled and encoded by a task on the
+    running asyncio event loop, e.g., the loop of the Jupyter kernel (unless
+    `prefetch` is disabled or no loop is running.) Since encodings are cached
+    by content, a triangulation shared by many decompositions is only
+    encoded once.
+
+    INPUT:
+
+    - ``items`` -- an iterable of objects that :func:`ipyvue_flatsurf.Widget` can display
+
+    - ``page_size`` -- the number of thumbnails per page
+
+    - ``columns`` -- the number of thumbnails per row
+
+    - ``size`` -- the width and height of a thumbnail in pixels
+
+    - ``prefetch`` -- whether to prepare the next page in the background
+
+    - ``codec`` -- the codec used by the thumbnails, see :mod:`ipyvue_flatsurf.codec`
+
+    """
+
+    def __init__(self, items, page_size=12, columns=4, size=200, prefetch=True, codec=None):
+        super().__init__(template=r"""
+            <div>
+                <div :style="{ display: 'grid', gridTemplateColumns: `repeat(${columns_prop}, ${size_prop}px)`, gap: '8px' }">
+                    <div v-for="index in visible_prop" :key="index" :style="{ width: `${size_prop}px`, height: `${size_prop}px`, overflow: 'hidden' }">
+                        <slot :name="`item-${index - 1}`" />
+                    </div>
+                </div>
+                <div>
+                    <button :disabled="page_prop === 0" @click="previous()">Previous</button>
+                    <span> Page {{ page_prop + 1 }} </span>
+                    <button :disabled="!has_next_prop" @click="next()">Next</button>
+                </div>
+            </div>
+        """)
+
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+
+        from ipyvue_flatsurf.codec import get_codec
+
+        self._iterator = iter(items)
+        self._items = []
+        self._exhausted = False
+        self._page_size = page_size
+        self._codec = get_codec(codec)
+        self._widgets = []
+
+        self._prefetch_enabled = prefetch
+        self._prefetching = None
+
+        self.columns_prop = columns
+        self.size_prop = size
+
+        self.page = 0
+
+    @property
+    def page(self):
+        r"""
+        The index of the page that is currently shown.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+            >>> S = translation_surfaces.mcmullen_L(1, 1, 1, 1)
+            >>> O = GL2ROrbitClosure(S)
+            >>> G = GalleryWidget(O.decompositions(bound=64), page_size=4)
+
+            >>> G.page = 2
+            >>> G.page
+            2
+
+        """
+        return self.page_prop
+
+    @page.setter
+    def page(self, page):
+        if page < 0:
+            raise ValueError("page must not be negative")
+
+        # Pull one more item than needed to know whether there is a next page.
+        self._fetch((page + 1) * self._page_size + 1)
+
+        start = page * self._page_size
+        if page != 0 and start >= len(self._items):
+            raise ValueError(f"there is no page {page}")
+
+        from ipyvue_flatsurf.widget import Widget
+
+        previous = self._widgets
+        self._widgets = [self._thumbnail(Widget(item, codec=self._codec)) for item in self._items[start:start + self._page_size]]
+
+        self._set_slots({f"item-{index}": widget for (index, widget) in enumerate(self._widgets)})
+
+        self.visible_prop = len(self._widgets)
+        self.page_prop = page
+        self.has_next_prop = len(self._items) > start + self._page_size
+
+        # Only the widgets on the current page are kept alive.
+        for widget in previous:
+            widget.close()
+
+        if self._prefetch_enabled:
+            import asyncio
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                self._prefetching = loop.create_task(self._prefetch((page + 2) * self._page_size))
+
+    @property
+    def widgets(self):
+        r"""
+        The widgets shown on the current page.
+        """
+        return list(self._widgets)
+
+    @property
+    def items(self):
+        r"""
+        The items that have been pulled from the underlying iterable so far.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+            >>> S = translation_surfaces.mcmullen_L(1, 1, 1, 1)
+            >>> O = GL2ROrbitClosure(S)
+            >>> G = GalleryWidget(O.decompositions(bound=64), page_size=4, prefetch=False)
+            >>> len(G.items)
+            5
+
+        """
+        return list(self._items)
+
+    @JavaScriptVueWidget.callback
+    def next(self):
+        r"""
+        Show the next page.
+        """
+        if self.has_next_prop:
+            self.page = self.page + 1
+
+    @JavaScriptVueWidget.callback
+    def previous(self):
+        r"""
+        Show the previous page.
+        """
+        if self.page > 0:
+            self.page = self.page - 1
+
+    def close(self):
+        r"""
+        Close this widget and the thumbnails it shows.
+        """
+        if self._prefetching is not None:
+            self._prefetching.cancel()
+            self._prefetching = None
+
+        for widget in self._widgets:
+            widget.close()
+        self._widgets = []
+
+        super().close()
+
+    def _thumbnail(self, widget):
+        r"""
+        Strip `widget` down so it can be shown as a small thumbnail.
+        """
+        widget.labels = None
+        widget.action = None
+        return widget
+
+    def _fetch(self, count):
+        r"""
+        Pull items from the underlying iterable until there are `count` of
+        them (or the iterable is exhausted.)
+        """
+        if self._prefetching is not None:
+            # The prefetching task only runs between steps of the event
+            # loop, so it is not pulling from the iterable right now and can
+            # be stopped. Whatever it pulled and encoded so far is kept.
+            self._prefetching.cancel()
+            self._prefetching = None
+
+        self._pull(count)
+
+    def _pull(self, count):
+        while not self._exhausted and len(self._items) < count:
+            try:
+                self._items.append(next(self._iterator))
+            except StopIteration:
+                self._exhausted = True
+
+    async def _prefetch(self, count):
+        r"""
+        Pull items until there are `count` of them and warm the encoding
+        cache for the ones that are not shown yet.
+
+        This runs as a task on the event loop while the current page is
+        shown. It gives control back to the loop after each item it pulls and
+        after each encoding so that the kernel stays responsive.
+        """
+        import asyncio
+
+        while not self._exhausted and len(self._items) < count:
+            await asyncio.sleep(0)
+            self._pull(len(self._items) + 1)
+
+        for item in self._items[count - self._page_size:count]:
+            for encode in self._encodings(item):
+                await asyncio.sleep(0)
+                encode()
+
+    def _encodings(self, item):
+        r"""
+        Return the encodings that the widget showing `item` needs, as
+        callables that put them into the encoding cache.
+
+        Items that :func:`ipyvue_flatsurf.Widget` cannot show are skipped;
+        creating the widget for such an item reports the error when its page
+        is shown.
+        """
+        from ipyvue_flatsurf.widget import is_flow_decomposition, is_flow_component, is_flat_triangulation
+        from ipyvue_flatsurf.encoding.cache import cached
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation, encode_flat_triangulation_columnar
+        from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+
+        encode_triangulation = encode_flat_triangulation_columnar if self._codec.binary else encode_flat_triangulation
+
+        def encode_components(components):
+            return [lambda component=component: cached(encode_flow_component, component, None, self._codec.binary) for component in components]
+
+        if is_flow_decomposition(item):
+            return [lambda: cached(encode_triangulation, item.surface())] + encode_components(item.components())
+
+        if is_flow_component(item):
+            return [lambda: cached(encode_triangulation, item.decomposition().surface())] + encode_components([item])
+
+        if is_flat_triangulation(item):
+            return [lambda: cached(encode_triangulation, item)]
+
+        from sage.structure.parent import Parent
+        from flatsurf.geometry.categories import TranslationSurfaces
+        if isinstance(item, Parent) and item in TranslationSurfaces().FiniteType().WithoutBoundary():
+            from ipyvue_flatsurf.conversion import to_pyflatsurf
+            return [lambda: cached(encode_triangulation, to_pyflatsurf(item))]
+
+        return []
+
+    page_prop = Int(0).tag(sync=True)
+    visible_prop = Int(0).tag(sync=True)
+    has_next_prop = Bool(False).tag(sync=True)
+    columns_prop = Int(4).tag(sync=True)
+    size_prop = Int(200).tag(sync=True)
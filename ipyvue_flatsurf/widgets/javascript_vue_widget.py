@@ -0,0 +1,140 @@
+r"""
+A base class for our Vue widgets whose components are all written in
+JavaScript.
+
+EXAMPLES::
+
+    >>> class Hello(JavaScriptVueWidget):
+    ...     def __init__(self):
+    ...         super().__init__(template="<div @click='hello()'>Hello</div>")
+    ...
+    ...     @JavaScriptVueWidget.callback
+    ...     def hello(self):
+    ...         pass
+
+    >>> widget = Hello()
+
+Unlike a plain ``VueWidget``, the widget does not ship the Python sources of
+ipymuvue to the frontend::
+
+    >>> widget._VueWidget__assets
+    {}
+
+The callbacks of a class are only determined once::
+
+    >>> widget._VueWidget__methods
+    ['hello']
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from functools import cache
+
+from ipymuvue.widgets import VueWidget
+
+
+class JavaScriptVueWidget(VueWidget):
+    r"""
+    A VueWidget whose components are written in JavaScript.
+
+    Creating a VueWidget has a considerable per-instance overhead that this
+    class avoids since we create lots of widgets, e.g., when displaying many
+    surfaces.
+    """
+
+    def _initialize_assets(self, assets):
+        r"""
+        Prepare the virtual file system for `assets`.
+
+        VueWidget adds all the Python files of ipymuvue to the assets of every
+        widget since components written in Python need them in the frontend.
+        Reading these files for every widget is costly. Our components are
+        written in JavaScript, so we only send `assets`, validated and
+        converted to bytes the same way VueWidget does it.
+
+        EXAMPLES::
+
+            >>> import io
+            >>> widget = JavaScriptVueWidget(template="<div/>", assets={"a.js": "a", "b.js": io.BytesIO(b"b")})
+            >>> widget._VueWidget__assets
+            {'a.js': b'a', 'b.js': b'b'}
+
+        ::
+
+            >>> JavaScriptVueWidget(template="<div/>", assets={1: "a"})
+            Traceback (most recent call last):
+            ...
+            TypeError: file name must be a string
+            >>> JavaScriptVueWidget(template="<div/>", assets={"a.js": 1})
+            Traceback (most recent call last):
+            ...
+            NotImplementedError: assets must be convertible to bytes
+
+        """
+        for (fname, content) in assets.items():
+            if not isinstance(fname, str):
+                raise TypeError("file name must be a string")
+
+            if hasattr(content, "read"):
+                # Resolve files to their actual content.
+                content = content.read()
+
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+
+            if not isinstance(content, bytes):
+                raise NotImplementedError("assets must be convertible to bytes")
+
+            assets[fname] = content
+
+        self._VueWidget__assets = assets
+
+    def _set_slots(self, slots):
+        r"""
+        Replace the widgets in all the slots of this widget with `slots`, a
+        dict mapping slot names to widgets.
+
+        Unlike :meth:`slot`, this removes the widgets from slots that are not
+        in `slots`.
+        """
+        self._VueWidget__children = dict(slots)
+
+    @classmethod
+    def _getmembers(cls, object, predicate=None):
+        r"""
+        Return the members of `object` that are callbacks.
+
+        VueWidget only uses this to determine the callbacks exposed to the
+        frontend. By default, it evaluates every attribute of every widget,
+        including all properties. We determine the callbacks once per class
+        instead.
+        """
+        members = [(name, getattr(object, name)) for name in cls._callbacks()]
+        return [(name, value) for (name, value) in members if predicate is None or predicate(value)]
+
+    @classmethod
+    @cache
+    def _callbacks(cls):
+        r"""
+        Return the names of the methods of this class that are marked as
+        :meth:`callback`.
+        """
+        import inspect
+        return sorted(name for name in dir(cls) if getattr(inspect.getattr_static(cls, name), "_VueWidget__is_callback", False))
@@ -0,0 +1,99 @@
+r"""
+A placeholder widget that only creates the actual widget once it is
+displayed in a frontend.
+
+Converting and encoding a surface for vue-flatsurf can be expensive. When a
+notebook is executed without a frontend, e.g., with nbconvert, or when its
+output is never rendered, all that work is wasted. This placeholder
+creates the actual widget only when a view of it mounts in the browser.
+
+EXAMPLES::
+
+    >>> from flatsurf import translation_surfaces
+    >>> S = translation_surfaces.square_torus()
+
+    >>> from ipyvue_flatsurf import Widget
+    >>> W = LazyWidget(lambda: Widget(S), repr(S))
+    >>> W
+    LazyWidget(...)
+
+Nothing has been created yet. It is created when the frontend mounts the
+placeholder or when the widget is requested explicitly::
+
+    >>> W.widget
+    TranslationSurfaceWidget(...)
+
+Without a frontend, the placeholder is shown as plain text::
+
+    >>> W._repr_mimebundle_()["text/plain"]
+    Output()
+    'Translation Surface in H_1(0) built from a square'
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+from traitlets import Unicode
+
+from ipyvue_flatsurf.widgets.javascript_vue_widget import JavaScriptVueWidget
+
+
+class LazyWidget(JavaScriptVueWidget):
+    r"""
+    A placeholder that shows `description` until it is mounted in the
+    frontend and then shows the widget produced by `create`.
+    """
+
+    def __init__(self, create, description):
+        # The vnode hook fires for every view of this widget but we create
+        # the actual widget only once and show it in the slot.
+        super().__init__(template=r"""
+            <div @vue:mounted="materialize()">
+                <slot><pre>{{ description_prop }}</pre></slot>
+            </div>
+        """)
+
+        self._create = create
+        self._widget = None
+        self.description_prop = description
+
+    @JavaScriptVueWidget.callback
+    def materialize(self):
+        r"""
+        Create the actual widget if it has not been created yet.
+        """
+        if self._widget is None:
+            self._widget = self._create()
+            self._create = None
+            self.slot(self._widget)
+
+    @property
+    def widget(self):
+        r"""
+        The actual widget, created on first access.
+        """
+        self.materialize()
+        return self._widget
+
+    def _repr_mimebundle_(self, **kwargs):
+        bundle = super()._repr_mimebundle_(**kwargs)
+        bundle["text/plain"] = self.description_prop
+        return bundle
+
+    description_prop = Unicode("").tag(sync=True)
@@ -39,7 +39,11 @@ from ipyvue_flatsurf.widgets.vue_flatsurf_widget import VueFlatsurfWidget
 
 
 class TranslationSurfaceWidget(VueFlatsurfWidget):
-    def __init__(self, surface):
-        from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
-        triangulation = to_pyflatsurf(surface)
-        VueFlatsurfWidget.__init__(self, triangulation)
+    def __init__(self, surface, instrument=None, **kwargs):
+        from ipyvue_flatsurf.instrumentation import Stats, collecting
+        stats = Stats.create(instrument)
+
+        from ipyvue_flatsurf.conversion import to_pyflatsurf
+        with collecting(stats):
+            triangulation = to_pyflatsurf(surface)
+        VueFlatsurfWidget.__init__(self, triangulation, instrument=stats, **kwargs)
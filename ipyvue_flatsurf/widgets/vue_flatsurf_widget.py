@@ -20,33 +20,93 @@ A generic base class interfacing with the vue_flatsurf frontend widgets.
 #  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
 # ********************************************************************
 
-from ipymuvue.widgets import VueWidget
+from functools import cache
+
 from traitlets import Unicode, Any, List, Bool
 from ipywidgets.widgets.widget import widget_serialization
 
+from ipyvue_flatsurf.widgets.javascript_vue_widget import JavaScriptVueWidget
+
 
-class VueFlatsurfWidget(VueWidget):
+class VueFlatsurfWidget(JavaScriptVueWidget):
     r"""
     Generic base class for most other widgets to interface with vue-flatsurf's
     Widget component.
     """
 
-    def __init__(self, triangulation, action="glue", flow_components=[]):
-        super().__init__(template=VueFlatsurfWidget._create_template(*[name[:-len('_prop')] for name in dir(type(self)) if name.endswith("_prop")]),
-            components={
-                "vue-flatsurf-widget": r"""
-<script>
-import { Widget } from "https://unpkg.com/vue-flatsurf@0.12.1/dist/vue-flatsurf.umd.js";
+    def __init__(self, triangulation, action="glue", flow_components=[], codec=None, instrument=None, detail=None):
+        from ipyvue_flatsurf.instrumentation import Stats
+        self._stats = Stats.create(instrument)
 
-export default Widget;
-</script>"""
+        # The template and the component are the same for all widgets of a
+        # class. Since the component is always sent under the same name, the
+        # frontend can resolve it from the same asset for every widget.
+        super().__init__(template=type(self)._template(),
+            components={
+                "vue-flatsurf-widget": "vue_flatsurf_widget.vue",
+            },
+            assets={
+                "vue_flatsurf_widget.vue": VueFlatsurfWidget._component(),
             })
 
-        self.triangulation = triangulation
-        self.action = action
-        self.flow_components = flow_components
-        self.path = None
-        self.saddle_connections = []
+        from ipyvue_flatsurf.codec import get_codec
+        self._codec = get_codec(codec)
+
+        # The columnar encoding of the triangulation last sent in full and the
+        # encoding that the frontend currently shows with the patch applied.
+        self._triangulation_base = None
+        self._triangulation_encoded = None
+        self._triangulation_revision = 0
+
+        # The task that encodes flow components progressively, see
+        # set_flow_components().
+        self._streaming = None
+
+        # The requested level of detail and the half edges shown in full
+        # detail in an overview, see detail and focus().
+        from ipyvue_flatsurf.encoding.detail import get_detail, get_detail_budget
+        self._detail = None if detail is None else get_detail(detail)
+        self._detail_budget = get_detail_budget()
+        self._region = None
+        self._flow_components = ([], None, True, 1)
+        self._saddle_connections = []
+        self._path = None
+
+        # The encoded flow components, saddle connections, and paths shown in
+        # the frontend, whose saddle connections are sent in a shared table
+        # with the binary codec, see _send_encoded().
+        from ipyvue_flatsurf.encoding.saddle_connection_table import SaddleConnectionTable
+        self._saddle_connection_table = SaddleConnectionTable()
+        self._shown = {"flow_components_prop": [], "saddle_connections_prop": [], "paths_prop": []}
+        self._references = {prop: [] for prop in self._shown}
+
+        # The connections in the table are only found by their vector for
+        # the triangulation they were shown on. This counts the changes of
+        # the triangulation and records which one each trait was shown on.
+        self._table_revision = 0
+        self._shown_revision = {prop: 0 for prop in self._shown}
+
+        # The chunks of the table of saddle connections and the payloads that
+        # have been appended in the frontend but are not part of the synced
+        # traits yet, see _append_encoded().
+        self._table_chunks = []
+        self._appended = {"flow_components_prop": []}
+
+        # Render the overview only once everything has been set.
+        self._overview_paused = True
+
+        with self._collecting():
+            self.triangulation = triangulation
+            self.action = action
+            self.flow_components = flow_components
+            self.path = None
+            self.saddle_connections = []
+
+            if self.detail == "reduced":
+                self.labels = None
+
+            self._overview_paused = False
+            self._update_overview()
 
     @property
     def triangulation(self):
@@ -68,15 +128,72 @@ export default Widget;
             >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
             >>> W.triangulation = to_pyflatsurf(S)
 
+        When the triangulation is set again after a few flips, only the
+        changes are sent to the frontend (with the default binary codec)::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = to_pyflatsurf(translation_surfaces.mcmullen_L(1, 1, 1, 1))
+            >>> W = Widget(S)
+            >>> W.triangulation_patch_prop is None
+            True
+
+            >>> T = W.triangulation
+            >>> T.flip(next(he for he in T.halfEdges() if T.convex(he, True)))
+            >>> W.triangulation = T
+            >>> W.triangulation_patch_prop
+            {'codec': 'binary', 'header': <memory at 0x...>, 'buffers': [...]}
+
         """
         return self._triangulation
 
     @triangulation.setter
     def triangulation(self, triangulation):
-        self._triangulation = triangulation
+        with self._collecting():
+            self._set_triangulation(triangulation)
+            self._update_overview()
 
-        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
-        self.triangulation_prop = VueFlatsurfWidget._to_yaml(encode_flat_triangulation(triangulation))
+    def _set_triangulation(self, triangulation):
+        self._triangulation = triangulation
+        self._halfEdges = len(triangulation.halfEdges())
+
+        from ipyvue_flatsurf.encoding.cache import cached
+
+        if not self._codec.binary:
+            from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation
+            self._triangulation_base = None
+            self._triangulation_encoded = None
+            self.triangulation_patch_prop = None
+            self.triangulation_prop = self._encode(cached(encode_flat_triangulation, triangulation))
+            return
+
+        from ipyvue_flatsurf.encoding.flat_triangulation_encoding import encode_flat_triangulation_columnar, diff_flat_triangulation_columnar
+        encoded = cached(encode_flat_triangulation_columnar, triangulation)
+
+        import numpy
+        if self._triangulation_encoded is not None and all(numpy.array_equal(self._triangulation_encoded[key], encoded[key]) for key in encoded):
+            # The frontend already shows this triangulation.
+            return
+
+        # Saddle connections of the new triangulation must not be confused
+        # with the ones of the old triangulation in the table of saddle
+        # connections, see _send_encoded().
+        self._table_revision += 1
+
+        patch = None
+        if self._triangulation_base is not None:
+            patch = diff_flat_triangulation_columnar(self._triangulation_base, encoded)
+
+        self._triangulation_encoded = encoded
+
+        if patch is None:
+            self._triangulation_base = encoded
+            self._triangulation_revision += 1
+            self.triangulation_patch_prop = None
+            self.triangulation_prop = self._encode(dict(encoded, revision=self._triangulation_revision))
+        else:
+            # The patch is relative to the triangulation last sent in full,
+            # so that views that are created later can still apply it.
+            self.triangulation_patch_prop = self._encode(dict(patch, revision=self._triangulation_revision))
 
     @property
     def action(self):
@@ -129,10 +246,27 @@ export default Widget;
         """
         return self._flow_components[0]
 
-    def set_flow_components(self, flow_components, deformation=None):
+    def set_flow_components(self, flow_components, deformation=None, progressive=False, check=True, processes=1):
         r"""
         Set the flow components currently visible in the widget.
 
+        The saddle connections on the perimeters of the components are pulled
+        back along `deformation` once and shared by all components. If
+        `check` is not set, these pullbacks are not verified with exact
+        arithmetic which is a bit faster.
+
+        If `progressive` is set and an asyncio event loop is running, e.g., in
+        a Jupyter kernel, this returns immediately and the components are
+        encoded and sent one by one from a task on that loop, cheapest (i.e.,
+        cylinders with short perimeters) first. The task is available as
+        :attr:`streaming` until it completes. Without a running event loop,
+        everything is encoded right away.
+
+        If `processes` is more than one, the components are encoded on that
+        many processes, see :mod:`ipyvue_flatsurf.encoding.parallel`. This is
+        only possible without a `deformation` since deformations cannot be
+        sent to another process.
+
         EXAMPLES::
 
             >>> from flatsurf import polygons, similarity_surfaces, GL2ROrbitClosure
@@ -149,18 +283,243 @@ export default Widget;
             >>> W = Widget(S)
             >>> W.set_flow_components(D.components(), deformation.section())
 
+        ::
+
+            >>> W.set_flow_components(D.components(), deformation.section(), check=False)
+
+        Components are only streamed progressively when an event loop is
+        running::
+
+            >>> import asyncio
+            >>> async def show():
+            ...     W.set_flow_components(D.components(), deformation.section(), progressive=True)
+            ...     print(len(W.flow_components_prop))
+            ...     await W.streaming
+            ...     print(len(W.flow_components_prop) == len(D.components()))
+            >>> asyncio.run(show())
+            0
+            True
+
+        Components can be encoded on several processes::
+
+            >>> D = next(GL2ROrbitClosure(S).decompositions(bound=64))
+            >>> W = Widget(S)
+            >>> W.set_flow_components(D.components(), processes=2)
+
         """
+        if self._streaming is not None:
+            self._streaming.cancel()
+            self._streaming = None
+
         flow_components = list(flow_components)
-        self._flow_components = (flow_components, deformation)
+
+        if self.detail == "overview":
+            self._flow_components = (flow_components, deformation, check, processes)
+            self._send_encoded("flow_components_prop", [])
+            self._update_overview()
+            return
+
+        progressive = progressive or self.detail == "reduced"
+
+        if progressive:
+            import asyncio
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                progressive = False
+            else:
+                flow_components.sort(key=lambda component: (not component.cylinder(), len(component.perimeter())))
+
+        self._flow_components = (flow_components, deformation, check, processes)
+
+        # All components share the saddle connections that they pulled back
+        # along the deformation.
+        from ipyvue_flatsurf.encoding.flow_component_encoding import Pullback
+        pullback = None if deformation is None else Pullback(deformation, check=check)
+
+        if progressive:
+            self._send_encoded("flow_components_prop", [])
+            self._streaming = loop.create_task(self._stream_flow_components(flow_components, pullback, processes))
+            return
 
         from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
-        self.flow_components_prop = []
-        self.flow_components_prop = [VueFlatsurfWidget._to_yaml(encode_flow_component(component, deformation)) for component in flow_components]
+        from ipyvue_flatsurf.encoding.cache import cached
+        with self._collecting():
+            if pullback is None:
+                from ipyvue_flatsurf.encoding.parallel import prefetch_flow_components
+                for (_, future) in prefetch_flow_components(flow_components, self._codec.binary, processes):
+                    future.result()
+
+            encoded = [cached(encode_flow_component, component, pullback, self._codec.binary) for component in flow_components]
+
+            self._send_encoded("flow_components_prop", encoded)
+
+    async def _stream_flow_components(self, flow_components, pullback, processes):
+        r"""
+        Encode `flow_components` and append them to the components shown
+        one by one, giving control back to the event loop in between.
+
+        The components are pulled back with `pullback`, see
+        :class:`ipyvue_flatsurf.encoding.flow_component_encoding.Pullback`.
+        Without a pullback, they are encoded on `processes` processes.
+        """
+        import asyncio
+        from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+        from ipyvue_flatsurf.encoding.cache import cached
+
+        prefetched = {}
+        if pullback is None:
+            from ipyvue_flatsurf.encoding.parallel import prefetch_flow_components
+            for (components, future) in prefetch_flow_components(flow_components, self._codec.binary, processes):
+                prefetched.update((id(component), future) for component in components)
+
+        for component in flow_components:
+            if id(component) in prefetched:
+                await asyncio.wrap_future(prefetched[id(component)])
+            else:
+                await asyncio.sleep(0)
+            with self._collecting():
+                encoded = cached(encode_flow_component, component, pullback, self._codec.binary)
+                await self._append_encoded("flow_components_prop", [encoded])
+
+        with self._collecting():
+            self._sync_appended()
+
+        self._streaming = None
+
+    @property
+    def streaming(self):
+        r"""
+        The asyncio task that progressively sends flow components to the
+        frontend or ``None`` if no components are pending, see
+        :meth:`set_flow_components`.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = translation_surfaces.square_torus()
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(S)
+            >>> W.streaming is None
+            True
+
+        """
+        return self._streaming
 
     @flow_components.setter
     def flow_components(self, flow_components):
         self.set_flow_components(flow_components)
 
+    @property
+    def detail(self):
+        r"""
+        The level of detail at which the surface is shown, see
+        :mod:`ipyvue_flatsurf.encoding.detail`.
+
+        Unless a level of detail was requested explicitly, it is chosen from
+        the size of the triangulation and the budget that was set with
+        :func:`ipyvue_flatsurf.encoding.detail.set_detail_budget` when this
+        widget was created.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = translation_surfaces.square_torus();
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(S)
+            >>> W.detail
+            'full'
+
+        Instead of the interactive vue-flatsurf widget, an overview is a
+        picture rendered in the kernel::
+
+            >>> W.detail = "overview"
+            >>> W.overview_prop
+            '<svg ...</svg>'
+
+        Going back to the automatically chosen level of detail::
+
+            >>> W.detail = None
+            >>> W.overview_prop is None
+            True
+
+        Changing the budget does not change the level of detail of existing
+        widgets::
+
+            >>> from ipyvue_flatsurf.encoding.detail import set_detail_budget
+            >>> set_detail_budget(1)
+            >>> W.detail
+            'full'
+            >>> Widget(S).detail
+            'reduced'
+            >>> set_detail_budget(4096)
+
+        """
+        from ipyvue_flatsurf.encoding.detail import get_detail
+        return get_detail(self._detail, halfEdges=self._halfEdges, budget=self._detail_budget)
+
+    @detail.setter
+    def detail(self, detail):
+        from ipyvue_flatsurf.encoding.detail import get_detail
+        self._detail = None if detail is None else get_detail(detail)
+
+        with self._collecting():
+            if self.detail == "overview":
+                self._send_encoded("flow_components_prop", [])
+                self._send_encoded("saddle_connections_prop", [])
+                self._send_encoded("paths_prop", [])
+                self._update_overview()
+            else:
+                self.overview_prop = None
+                if self.detail == "reduced":
+                    self.labels = None
+                flow_components, deformation, check, processes = self._flow_components
+                self.set_flow_components(flow_components, deformation, check=check, processes=processes)
+                self.saddle_connections = self._saddle_connections
+                self.path = self._path
+
+    def focus(self, region=None):
+        r"""
+        Show the faces containing the half edges `region` in full detail when
+        this widget shows an overview, see :attr:`detail`.
+
+        The half edges can be given as pyflatsurf half edges or by their ids.
+        If `region` is ``None``, no faces are shown in full detail.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = translation_surfaces.square_torus();
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(S, detail="overview")
+            >>> W.focus([1])
+            >>> '>1</text>' in W.overview_prop
+            True
+
+        """
+        self._region = None if region is None else [halfEdge if isinstance(halfEdge, int) else halfEdge.id() for halfEdge in region]
+        self._update_overview()
+
+    def _update_overview(self):
+        r"""
+        Render the picture shown instead of vue-flatsurf if this widget
+        shows an overview.
+        """
+        if self._overview_paused:
+            return
+
+        if self.detail != "overview":
+            self.overview_prop = None
+            return
+
+        from ipyvue_flatsurf.instrumentation import stage
+        with self._collecting():
+            with stage("overview"):
+                self.overview_prop = self.to_svg(detail="overview")
+
     @property
     def labels(self):
         r"""
@@ -221,6 +580,285 @@ export default Widget;
         else:
             raise ValueError(f"Unexpected labels kind '{value}'")
 
+    @property
+    def codec(self):
+        r"""
+        The codec used to serialize the data that is sent to the frontend.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = translation_surfaces.square_torus();
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(S)
+            >>> W.codec
+            BinaryCodec()
+
+        The binary codec sends the triangulation in a columnar format as raw
+        binary buffers::
+
+            >>> W.triangulation_prop
+            {'codec': 'binary', 'header': <memory at 0x...>, 'buffers': [<memory at 0x...>, <memory at 0x...>]}
+
+        Changing the codec resends all the data to the frontend::
+
+            >>> W.codec = "json"
+            >>> W.triangulation_prop
+            '{"vertices":[[1,-3,2,-1,3,-2]],"vectors":{"1":{"x":1.0,"y":0.0},"2":{"x":0.0,"y":1.0},"3":{"x":-1.0,"y":-1.0}}}'
+
+        The YAML codec is available for compatibility with older versions of
+        this package::
+
+            >>> W = Widget(S, codec="yaml")
+            >>> W.codec
+            YAMLCodec()
+
+        """
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec):
+        from ipyvue_flatsurf.codec import get_codec
+        self._codec = get_codec(codec)
+
+        from ipyvue_flatsurf.encoding.saddle_connection_table import SaddleConnectionTable
+        self._saddle_connection_table = SaddleConnectionTable()
+        self._shown = {prop: [] for prop in self._shown}
+        self._references = {prop: [] for prop in self._shown}
+        self._table_chunks = []
+        self._appended = {prop: [] for prop in self._appended}
+        self.saddle_connection_table_prop = []
+
+        self._triangulation_base = None
+        self._triangulation_encoded = None
+        self.triangulation = self.triangulation
+        flow_components, deformation, check, processes = self._flow_components
+        self.set_flow_components(flow_components, deformation, check=check, processes=processes)
+        self.saddle_connections = self.saddle_connections
+        if self._path is not None:
+            self.path = self._path
+
+    def _encode(self, x):
+        r"""
+        Return `x` serialized with this widget's codec.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = translation_surfaces.square_torus();
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(S)
+            >>> W._encode({"a": 1337})
+            {'codec': 'binary', 'header': <memory at 0x...>, 'buffers': []}
+
+        """
+        from ipyvue_flatsurf.instrumentation import stage
+        with stage(f"serialize.{self._codec.name}"):
+            return self._codec.encode(x)
+
+    def _send_encoded(self, prop, encoded):
+        r"""
+        Send the encoded flow components, saddle connections, or paths
+        `encoded` to the frontend as the trait `prop`.
+
+        With the binary codec, the saddle connections in `encoded` are
+        replaced by references into a table that is shared by all these
+        traits, see :mod:`ipyvue_flatsurf.encoding.saddle_connection_table`.
+        Only connections that are not in the table yet are sent again.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+            >>> S = translation_surfaces.square_torus()
+            >>> D = next(GL2ROrbitClosure(S).decompositions(bound=64))
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(D)
+            >>> len(W.saddle_connection_table_prop)
+            1
+
+        Showing saddle connections that are already part of the perimeter of
+        a component does not send them again::
+
+            >>> W.saddle_connections = [connection.saddleConnection() for connection in D.components()[0].perimeter()]
+            >>> len(W.saddle_connection_table_prop)
+            1
+
+        After the triangulation changes, connections are not looked up
+        among the connections of the old triangulation by their vector
+        anymore since they might cross different half edges now. So the same
+        saddle connections are sent again::
+
+            >>> from flatsurf.geometry.pyflatsurf_conversion import to_pyflatsurf
+            >>> T = to_pyflatsurf(translation_surfaces.mcmullen_L(1, 1, 1, 1))
+            >>> W = Widget(T)
+            >>> W.saddle_connections = list(T.connections().bound(2))
+            >>> shown = len(W._saddle_connection_table)
+
+            >>> T.flip(next(he for he in T.halfEdges() if T.convex(he, True)))
+            >>> W.triangulation = T
+            >>> W.saddle_connections = list(T.connections().bound(2))
+            >>> len(W._saddle_connection_table) == 2 * shown
+            True
+
+        """
+        def send(prop, encoded):
+            # Reset the trait first so that the frontend gets the new value
+            # even if it compares equal to the old one.
+            setattr(self, prop, [])
+            setattr(self, prop, [self._encode(x) for x in encoded])
+            if prop in self._appended:
+                self._appended[prop] = []
+
+        if not self._codec.binary:
+            send(prop, encoded)
+            return
+
+        self._shown[prop] = list(encoded)
+        self._shown_revision[prop] = self._table_revision
+
+        self._saddle_connection_table.release(self._references[prop])
+        self._references[prop] = []
+        encoded = self._saddle_connection_table.refer(list(encoded), self._references[prop], self._table_revision)
+
+        # Connections that are not shown anymore stay in the table. When
+        # most of the table is unused, we rebuild it and send everything
+        # again.
+        if 2 * self._saddle_connection_table.used < len(self._saddle_connection_table):
+            from ipyvue_flatsurf.encoding.saddle_connection_table import SaddleConnectionTable
+            table = SaddleConnectionTable()
+            self._references = {key: [] for key in self._shown}
+            referred = {key: table.refer(value, self._references[key], self._shown_revision[key]) for (key, value) in self._shown.items()}
+            self._saddle_connection_table = table
+            self._table_chunks = [self._encode(table.pending())]
+            self.saddle_connection_table_prop = list(self._table_chunks)
+            for (key, value) in referred.items():
+                send(key, value)
+            return
+
+        pending = self._saddle_connection_table.pending()
+        if pending:
+            self._table_chunks.append(self._encode(pending))
+        if len(self.saddle_connection_table_prop) != len(self._table_chunks):
+            self.saddle_connection_table_prop = list(self._table_chunks)
+
+        send(prop, encoded)
+
+    async def _append_encoded(self, prop, encoded):
+        r"""
+        Send the encoded flow components `encoded` to the frontend in
+        addition to what has been sent as `prop` before.
+
+        Assigning to a synced trait sends its entire value again. So instead,
+        `encoded` (and the saddle connections it adds to the table) is sent
+        in a custom message that the frontend appends to what it shows. Once
+        done appending, :meth:`_sync_appended` updates the synced traits so
+        that views created later show the appended payloads as well.
+
+        The saddle connections that `encoded` adds to the table are sent in
+        the same message so that the frontend never sees a reference to a
+        connection it does not know yet.
+        """
+        appended = {}
+
+        if self._codec.binary:
+            self._shown[prop].extend(encoded)
+            encoded = self._saddle_connection_table.refer(list(encoded), self._references[prop], self._shown_revision[prop])
+
+            pending = self._saddle_connection_table.pending()
+            if pending:
+                chunk = self._encode(pending)
+                self._table_chunks.append(chunk)
+                appended["saddle_connection_table_prop"] = [chunk]
+
+        payloads = [self._encode(x) for x in encoded]
+        self._appended[prop].extend(payloads)
+        appended[prop] = payloads
+
+        await self._append(appended)
+
+    async def _append(self, appended):
+        r"""
+        Send the serialized payloads in `appended` to all views so they are
+        shown in addition to the values of the traits that are the keys of
+        `appended`.
+        """
+        from ipyvue_flatsurf.instrumentation import stage
+        with stage("sync"):
+            await self["flatsurf"].append({prop: [self._codec.to_json(payload) for payload in payloads] for (prop, payloads) in appended.items()}, return_when="IGNORE")
+
+    def _sync_appended(self):
+        r"""
+        Make the synced traits include everything that has been sent with
+        :meth:`_append_encoded`.
+        """
+        for (prop, payloads) in self._appended.items():
+            if payloads:
+                setattr(self, prop, getattr(self, prop) + payloads)
+                self._appended[prop] = []
+
+        if len(self.saddle_connection_table_prop) != len(self._table_chunks):
+            self.saddle_connection_table_prop = list(self._table_chunks)
+
+    def stats(self):
+        r"""
+        Return the time spent in the stages of encoding the data for this
+        widget and the number of bytes sent to the frontend for each synced
+        trait, see :mod:`ipyvue_flatsurf.instrumentation`.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = translation_surfaces.square_torus();
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(S, instrument=True)
+            >>> W.stats()["stages"]["encode_flat_triangulation_columnar"]
+            {'calls': 1, 'seconds': ...}
+
+        Instrumentation must be enabled when the widget is created::
+
+            >>> Widget(S).stats()
+            Traceback (most recent call last):
+            ...
+            ValueError: widget is not instrumented, create it with instrument=True
+
+        """
+        if self._stats is None:
+            raise ValueError("widget is not instrumented, create it with instrument=True")
+        return self._stats.as_dict()
+
+    def _collecting(self):
+        r"""
+        Return a context in which stages are recorded for this widget if it
+        is instrumented.
+        """
+        from ipyvue_flatsurf.instrumentation import collecting
+        return collecting(self._stats)
+
+    def send_state(self, key=None):
+        with self._collecting():
+            from ipyvue_flatsurf.instrumentation import stage
+            with stage("sync"):
+                super().send_state(key=key)
+
+    def _send(self, msg, buffers=None):
+        if self._stats is not None and msg.get("method") == "update":
+            import json
+            for (trait, value) in msg["state"].items():
+                size = len(json.dumps(value, default=str))
+                size += sum(memoryview(buffer).nbytes for (path, buffer) in zip(msg["buffer_paths"], buffers or []) if path[0] == trait)
+                self._stats.record_message(trait, size)
+        if self._stats is not None and msg.get("method") == "custom" and msg["content"].get("target") == "append":
+            import json
+            (appended,) = msg["content"]["args"]
+            for (trait, payloads) in appended.items():
+                self._stats.record_message(trait, len(json.dumps(payloads)))
+
+        super()._send(msg, buffers=buffers)
+
     @classmethod
     def _to_yaml(cls, x):
         r"""
@@ -232,16 +870,34 @@ export default Widget;
             'a: 1337'
 
         """
-        if not isinstance(x, dict):
-            raise NotImplementedError("Cannot convert this object to YAML yet.")
+        from ipyvue_flatsurf.codec import get_codec
+        return get_codec("yaml").encode(x)
+
+    @classmethod
+    @cache
+    def _template(cls):
+        r"""
+        Return the Vue template for the widgets of this class.
+
+        EXAMPLES::
+
+            >>> VueFlatsurfWidget._template()
+            '<vue-flatsurf-widget ref="flatsurf" :action="action_prop" ... />'
+            >>> VueFlatsurfWidget._template() is VueFlatsurfWidget._template()
+            True
+
+        """
+        return VueFlatsurfWidget._create_template(*[name[:-len('_prop')] for name in dir(cls) if name.endswith("_prop")])
 
-        from io import StringIO
-        buffer = StringIO()
-        from ruamel.yaml import YAML
-        yaml = YAML()
-        yaml.dump(x, buffer)
-        buffer.seek(0)
-        return buffer.read().strip()
+    @staticmethod
+    @cache
+    def _component():
+        r"""
+        Return the source code of the Vue component wrapping vue-flatsurf.
+        """
+        import os.path
+        with open(os.path.join(os.path.dirname(__file__), "vue_flatsurf_widget.vue"), "rb") as component:
+            return component.read()
 
     @classmethod
     def _create_template(cls, *props):
@@ -261,7 +917,11 @@ export default Widget;
     @property
     async def svg(self):
         r"""
-        Return the widget as a standalone SVG.
+        Return the widget as a standalone SVG as rendered by vue-flatsurf in
+        the browser, see :meth:`to_svg` to render without a browser.
+
+        When the widget shows an overview instead of vue-flatsurf, the
+        overview is returned, see :attr:`detail`.
 
         EXAMPLES::
 
@@ -277,9 +937,94 @@ export default Widget;
             >>> await W.svg  # doctest: +SKIP
             <svg ...>
 
+        ::
+
+            >>> import asyncio
+            >>> W.detail = "overview"
+            >>> asyncio.run(W.svg)
+            '<svg ...</svg>'
+
         """
+        if self.overview_prop is not None:
+            return self.overview_prop
+
         import asyncio
-        return await self["flatsurf"].svg(return_when=asyncio.FIRST_COMPLETED)
+        return await self["flatsurf"]["widget"].svg(return_when=asyncio.FIRST_COMPLETED)
+
+    def to_svg(self, width=400, detail="full"):
+        r"""
+        Return the widget as a standalone SVG rendered in the kernel.
+
+        Unlike :attr:`svg`, this does not need a notebook that shows the
+        widget. The layout of the triangulation is not the same as the one
+        chosen by vue-flatsurf, see :mod:`ipyvue_flatsurf.svg`.
+
+        If `detail` is ``"overview"``, the SVG is simplified, see
+        :func:`ipyvue_flatsurf.svg.render_svg`. The faces selected with
+        :meth:`focus` are still drawn in full detail then.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces, GL2ROrbitClosure
+            >>> S = translation_surfaces.square_torus()
+            >>> O = GL2ROrbitClosure(S)
+            >>> D = next(O.decompositions(bound=64))
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(D)
+            >>> W.to_svg()
+            '<svg xmlns="http://www.w3.org/2000/svg" width="400" ...</svg>'
+
+        """
+        from ipyvue_flatsurf.encoding.cache import cached
+        from ipyvue_flatsurf.encoding.flow_component_encoding import encode_flow_component
+        from ipyvue_flatsurf.encoding.saddle_connection_encoding import encode_saddle_connection
+        from ipyvue_flatsurf.encoding.path_encoding import encode_path
+        from ipyvue_flatsurf.svg import render_svg
+
+        flow_components, deformation, _, _ = self._flow_components
+
+        # The SVG does not depend on the crossings, so we can share the
+        # encodings that are sent to the frontend.
+        compress = self._codec.binary
+
+        return render_svg(
+            self.layout,
+            flow_components=[cached(encode_flow_component, component, deformation, compress) for component in flow_components],
+            saddle_connections=[cached(encode_saddle_connection, connection, compress) for connection in self.saddle_connections],
+            paths=[] if self._path is None else [encode_path(self._path, compress=compress)],
+            labels=self.labels,
+            width=width,
+            detail=detail,
+            region=self._region)
+
+    @property
+    def layout(self):
+        r"""
+        The layout of the triangles of the triangulation in the plane as
+        computed in the kernel, see :mod:`ipyvue_flatsurf.layout`.
+
+        The layout is computed once per triangulation and shared by all
+        widgets showing that triangulation. It is not the layout that
+        vue-flatsurf shows in the frontend, which users can also change by
+        gluing edges.
+
+        EXAMPLES::
+
+            >>> from flatsurf import translation_surfaces
+            >>> S = translation_surfaces.square_torus();
+
+            >>> from ipyvue_flatsurf import Widget
+            >>> W = Widget(S)
+            >>> W.layout
+            Layout of 2 faces
+            >>> W.layout.inner
+            array([ True,  True, False, False, False, False])
+
+        """
+        from ipyvue_flatsurf.encoding.cache import cached
+        from ipyvue_flatsurf.layout import flat_triangulation_layout
+        return cached(flat_triangulation_layout, self.triangulation)
 
     @property
     async def path(self):
@@ -314,20 +1059,33 @@ export default Widget;
             >>> asyncio.run(W.path)
             []
 
+        A path cannot be drawn when the widget shows an overview instead of
+        vue-flatsurf::
+
+            >>> W.path = None
+            >>> W.detail = "overview"
+            >>> asyncio.run(W.path)
+            Traceback (most recent call last):
+            ...
+            ValueError: cannot draw a path in an overview, set detail to "full" or "reduced" first
+
         """
         if self._path is None:
+            if self.overview_prop is not None:
+                raise ValueError('cannot draw a path in an overview, set detail to "full" or "reduced" first')
+
             self.action = "path"
 
             import asyncio
 
-            path = await self["flatsurf"].path("completed", return_when=asyncio.FIRST_COMPLETED)
+            path = await self["flatsurf"]["widget"].path("completed", return_when=asyncio.FIRST_COMPLETED)
 
             # TODO: Unfortunately, we have to query explicitly for the layout,
             # see https://github.com/flatsurf/vue-flatsurf/issues/55. Also we
             # cannot be sure that we are getting the layout from the one that
             # gave us the path, see
             # https://github.com/flatsurf/ipyvue-async/issues/1.
-            layout = await self["flatsurf"].layout("now", return_when=asyncio.FIRST_COMPLETED)
+            layout = await self["flatsurf"]["widget"].layout("now", return_when=asyncio.FIRST_COMPLETED)
 
             S = self.triangulation
 
@@ -342,12 +1100,6 @@ export default Widget;
 
             from pyflatsurf import flatsurf
 
-            path = [{
-                'vertex': [flatsurf.HalfEdge(x) for x in p['vertex']]
-            } if 'vertex' in p else {
-                'halfEdge': flatsurf.HalfEdge(p['halfEdge'])
-            } for p in path]
-
             connections = []
 
             # The input path consists of a list of points that are either at a
@@ -363,52 +1115,69 @@ export default Widget;
 
             # The half edges that the path is crossing, i.e., the half edges
             # that we are allowed to cross when reconstructing an equivalent
-            # representation of the path.
-            inner = [flatsurf.HalfEdge(e) for e in inner] + [flatsurf.HalfEdge(-e) for e in inner]
+            # representation of the path. We identify half edges by their ids
+            # throughout to make lookups cheap.
+            inner = set(inner) | {-e for e in inner}
+
+            # The next half edge in the face of a half edge, queried lazily
+            # since the search usually only visits a few faces.
+            nextInFace = {}
+
+            def next_in_face(face):
+                if face not in nextInFace:
+                    nextInFace[face] = S.nextInFace(flatsurf.HalfEdge(face)).id()
+                return nextInFace[face]
+
+            def source_faces(x):
+                if 'halfEdge' in x:
+                    return [S.previousAtVertex(flatsurf.HalfEdge(x['halfEdge'])).id()]
+                else:
+                    return x['vertex']
 
-            for source, target in zip(path, path[1:]):
-                def source_faces(x):
-                    if 'halfEdge' in x:
-                        return [S.previousAtVertex(x['halfEdge'])]
-                    else:
-                        return x['vertex']
-
-                def target_faces(x):
-                    if 'halfEdge' in x:
-                        return [x['halfEdge']]
-                    else:
-                        return x['vertex']
+            def target_faces(x):
+                if 'halfEdge' in x:
+                    return [x['halfEdge']]
+                else:
+                    return x['vertex']
 
+            for source, target in zip(path, path[1:]):
                 # We now pretend that we start in one of the faces attached to
                 # "start" and search for a path to a face attached to "target".
-                paths = {}
+                # For each face we reach, we record the half edge we came from
+                # so we can walk back to the source once we reached the target.
+                parents = {}
                 queue = []
 
-                def enqueue_face(face, partial):
-                    if face in paths:
-                        return
-
-                    paths[face] = partial
-                    queue.append(face)
-
-                    next = S.nextInFace(face)
-                    enqueue_face(next, partial + [face])
+                def enqueue_face(face, parent):
+                    # Walk around the face, every half edge in it is reachable
+                    # from the one before it.
+                    while face not in parents:
+                        parents[face] = parent
+                        queue.append(face)
+                        parent, face = face, next_in_face(face)
 
                 for source_face in source_faces(source):
-                    enqueue_face(source_face, [])
+                    enqueue_face(source_face, None)
 
                 while queue:
                     face = queue.pop()
                     if face in inner:
-                        enqueue_face(-face, paths[face] + [face])
+                        enqueue_face(-face, face)
 
                 for target_face in target_faces(target):
-                    if target_face in paths:
-                        connections.extend(paths[target_face])
+                    if target_face in parents:
+                        partial = []
+                        face = parents[target_face]
+                        while face is not None:
+                            partial.append(face)
+                            face = parents[face]
+                        connections.extend(reversed(partial))
                         break
                 else:
                     raise ValueError(f"Could not reconstruct the partial path from {source} to {target} that was reported by the frontend.")
 
+            connections = [flatsurf.HalfEdge(halfEdge) for halfEdge in connections]
+
             self._path = flatsurf.Path[type(S)]([flatsurf.SaddleConnection[type(S)](S, halfEdge) for halfEdge in connections])
         return self._path
 
@@ -419,16 +1188,26 @@ export default Widget;
             self.action = "path"
 
         if path is None:
-            self.paths_prop = []
+            self._send_encoded("paths_prop", [])
             self._path = None
+            self._update_overview()
         else:
             from pyflatsurf import flatsurf
             Path = flatsurf.Path[type(self.triangulation)]
             path = Path(list(path))
             self._path = path
 
+            if self.detail == "overview":
+                self._send_encoded("paths_prop", [])
+                self._update_overview()
+                return
+
             from ipyvue_flatsurf.encoding.path_encoding import encode_path
-            self.paths_prop = [VueFlatsurfWidget._to_yaml(encode_path(path))]
+            from ipyvue_flatsurf.instrumentation import stage
+            with self._collecting():
+                with stage("encode_path"):
+                    path = encode_path(path, compress=self._codec.binary)
+                self._send_encoded("paths_prop", [path])
 
     @property
     def saddle_connections(self):
@@ -456,14 +1235,27 @@ export default Widget;
     @saddle_connections.setter
     def saddle_connections(self, connections):
         from ipyvue_flatsurf.encoding.saddle_connection_encoding import encode_saddle_connection
+        from ipyvue_flatsurf.encoding.cache import cached, memoized_content_hashes
         self._saddle_connections = connections
-        self.saddle_connections_prop = [VueFlatsurfWidget._to_yaml(encode_saddle_connection(connection)) for connection in connections]
+
+        if self.detail == "overview":
+            self._send_encoded("saddle_connections_prop", [])
+            self._update_overview()
+            return
+
+        with self._collecting():
+            with memoized_content_hashes():
+                encoded = [cached(encode_saddle_connection, connection, self._codec.binary) for connection in connections]
+            self._send_encoded("saddle_connections_prop", encoded)
 
     template = Unicode("").tag(sync=True)
-    triangulation_prop = Unicode("").tag(sync=True)
+    triangulation_prop = Any("").tag(sync=True)
+    triangulation_patch_prop = Any(None).tag(sync=True)
     action_prop = Any(None).tag(sync=True)
     flow_components_prop = List([]).tag(sync=True)
     saddle_connections_prop = List([]).tag(sync=True)
+    saddle_connection_table_prop = List([]).tag(sync=True)
     paths_prop = List([]).tag(sync=True)
+    overview_prop = Any(None).tag(sync=True)
     show_numeric_labels_prop = Bool(False).tag(sync=True)
     show_outer_labels_prop = Bool(True).tag(sync=True)
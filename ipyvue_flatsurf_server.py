@@ -0,0 +1,115 @@
+r"""
+A Jupyter server extension that serves the vue-flatsurf frontend bundle.
+
+The widgets of ipyvue-flatsurf render with vue-flatsurf. When its bundle is
+shipped with this package, i.e., when it was downloaded with ``python -m
+ipyvue_flatsurf_server`` before building the package, the frontend loads it
+from the Jupyter server. Otherwise, e.g., when the extension is not enabled,
+the frontend falls back to loading it from unpkg.
+
+This lives outside of the ipyvue_flatsurf package since importing that
+package imports sage-flatsurf to install display hooks; the Jupyter server
+should not have to do that.
+
+EXAMPLES::
+
+    >>> bundle_url("/user/flatsurf/")
+    '/user/flatsurf/ipyvue-flatsurf/static/vue-flatsurf-0.12.1.umd.js'
+
+"""
+# ********************************************************************
+#  This file is part of ipyvue-flatsurf.
+#
+#        Copyright (C) 2025 Julian Rüth
+#
+#  ipyvue-flatsurf is free software: you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the Free
+#  Software Foundation, either version 3 of the License, or (at your option)
+#  any later version.
+#
+#  ipyvue-flatsurf is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+#  or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#  more details.
+#
+#  You should have received a copy of the GNU General Public License along with
+#  ipyvue-flatsurf. If not, see <https://www.gnu.org/licenses/>.
+# ********************************************************************
+
+# The version of vue-flatsurf that the widgets are built for. This must match
+# the version in ipyvue_flatsurf/widgets/vue_flatsurf_widget.vue.
+VERSION = "0.12.1"
+
+BUNDLE = f"vue-flatsurf-{VERSION}.umd.js"
+
+CDN = f"https://unpkg.com/vue-flatsurf@{VERSION}/dist/vue-flatsurf.umd.js"
+
+
+def static_path():
+    r"""
+    Return the directory in the ipyvue_flatsurf package that holds the
+    bundle (without importing ipyvue_flatsurf.)
+
+    EXAMPLES::
+
+        >>> static_path()
+        '.../ipyvue_flatsurf/static'
+
+    """
+    import os.path
+    from importlib.util import find_spec
+    return os.path.join(find_spec("ipyvue_flatsurf").submodule_search_locations[0], "static")
+
+
+def bundle_url(base_url):
+    r"""
+    Return the URL under which the Jupyter server at `base_url` serves the
+    bundle.
+    """
+    return f"{base_url.rstrip('/')}/ipyvue-flatsurf/static/{BUNDLE}"
+
+
+def download():
+    r"""
+    Download the vue-flatsurf bundle into the ipyvue_flatsurf package so
+    that it can be shipped with it.
+    """
+    import os
+    import urllib.request
+
+    os.makedirs(static_path(), exist_ok=True)
+
+    with urllib.request.urlopen(CDN) as response:
+        bundle = response.read()
+
+    if b"vue-flatsurf" not in bundle:
+        raise ValueError(f"{CDN} does not seem to be a vue-flatsurf bundle")
+
+    with open(os.path.join(static_path(), BUNDLE), "wb") as target:
+        target.write(bundle)
+
+
+def _jupyter_server_extension_points():
+    return [{"module": "ipyvue_flatsurf_server"}]
+
+
+def _load_jupyter_server_extension(server_app):
+    r"""
+    Serve the files in :func:`static_path` from the Jupyter server.
+    """
+    from jupyter_server.utils import url_path_join
+    from tornado.web import StaticFileHandler
+
+    class BundleHandler(StaticFileHandler):
+        def set_extra_headers(self, path):
+            # The file names contain the version of vue-flatsurf, so they
+            # never change.
+            self.set_header("Cache-Control", "public, max-age=31536000, immutable")
+
+    web_app = server_app.web_app
+    pattern = url_path_join(web_app.settings["base_url"], "ipyvue-flatsurf", "static", "(.*)")
+    web_app.add_handlers(".*$", [(pattern, BundleHandler, {"path": static_path()})])
+
+
+if __name__ == "__main__":
+    download()